@@ -1,11 +1,17 @@
 # advanced_filter/__init__.py
-# Cria aliases de submdulos para manter compatibilidade de imports
+# Cria aliases de submódulos para manter compatibilidade de imports
 # sem precisar de arquivos duplicados (facades).
+#
+# Os aliases são resolvidos sob demanda: `import advanced_filter` não importa pandas,
+# streamlit nem cria os handlers de log. O módulo real só é carregado no 1º uso, via
+# `__getattr__` (advanced_filter.engine como atributo) ou pelo finder abaixo
+# (`from advanced_filter.engine import X`, `from ..engine import X` dentro do pacote).
 
 from importlib import import_module as _import_module
+from importlib.machinery import ModuleSpec as _ModuleSpec
 import sys as _sys
 
-# Mapeia nomes antigos -> mdulos reais
+# Mapeia nomes antigos -> módulos reais
 _ALIASES = {
     "engine":        "advanced_filter.core.engine",
     "preprocessor":  "advanced_filter.core.preprocessor",
@@ -15,6 +21,7 @@ _ALIASES = {
     "scorer":        "advanced_filter.core.scorer",
     "dsl":           "advanced_filter.core.dsl",
     "config_loader": "advanced_filter.core.config_loader",
+    "profile_cache": "advanced_filter.core.profile_cache",
     "auditor":       "advanced_filter.core.auditor",
     "excel_io":      "advanced_filter.io.excel_io",
     "logs":          "advanced_filter.logs",
@@ -22,14 +29,45 @@ _ALIASES = {
 
 }
 
-# Eager alias: registra os submdulos antigos apontando para os novos
-# Isso garante que "from advanced_filter.engine import X" funcione.
-for _name, _target in _ALIASES.items():
-    _mod = _import_module(_target)
-    _sys.modules[__name__ + "." + _name] = _mod
-    globals()[_name] = _mod  # permite "import advanced_filter.engine as engine"
+class _AliasLoader:
+    """Entrega o módulo real no lugar do alias (o mesmo objeto, sem cópia)."""
 
-# Opcional: deixa a descoberta/auto-complete mais amigvel
+    def __init__(self, target: str):
+        self.target = target
+        self._real_spec = None
+
+    def create_module(self, spec):
+        module = _import_module(self.target)
+        self._real_spec = module.__spec__
+        return module
+
+    def exec_module(self, module):
+        # já executado pelo import do módulo real; o import machinery grava o spec do
+        # alias em module.__spec__ — devolve o real (reload/find_spec dependem dele)
+        module.__spec__ = self._real_spec
+
+class _AliasFinder:
+    """Resolve "advanced_filter.<alias>" para o módulo real no momento do import.
+    (Protocolo de finder/loader sem herdar de importlib.abc, que sozinho custa ~35 ms.)"""
+
+    def find_spec(self, fullname, path=None, target=None):
+        if not fullname.startswith(__name__ + "."):
+            return None
+        real = _ALIASES.get(fullname[len(__name__) + 1:])
+        if real is None or real == fullname:
+            return None  # não é alias (ou é o próprio módulo real): import normal
+        return _ModuleSpec(fullname, _AliasLoader(real))
+
+if not any(isinstance(f, _AliasFinder) for f in _sys.meta_path):
+    _sys.meta_path.insert(0, _AliasFinder())
+
+def __getattr__(name):
+    # permite "import advanced_filter as af; af.engine.run_filter(...)"
+    if name in _ALIASES:
+        return _import_module(__name__ + "." + name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Opcional: deixa a descoberta/auto-complete mais amigável
 def __dir__():
     return sorted(list(globals().keys()) + list(_ALIASES.keys()))
 
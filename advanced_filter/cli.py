@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Execução em lote sem Streamlit (agendamentos noturnos, servidores).
+
+Exemplos:
+  filtro-avancado dados.xlsx --sheet Plan1 --col Descricao -p perfis/Manutencao_Motor.yaml
+  filtro-avancado a.csv b.csv --col texto -p p1.yaml -p p2.yaml --format csv --out-dir saida \\
+      --workers 4 --dedup --chunk-size 20000
+  filtro-avancado dados.csv --col texto -p perfil.yaml --mode decision --format csv
+  filtro-avancado grande.xlsx --col texto -p perfil.yaml --pipeline --queue-depth 8
+
+Para cada par (entrada, perfil) grava `<entrada>__<perfil>.<ext>` e imprime linhas, tempos
+por etapa e vazão (linhas/s).
+"""
+from __future__ import annotations
+from typing import List, Optional
+import argparse
+import pathlib
+import sys
+import time
+
+from advanced_filter.core.config_loader import load_config
+from advanced_filter.core.engine import run_filter, compile_profile, CompiledProfile, MODES, EXECUTORS
+
+FORMATS = ("xlsx", "split", "csv")
+
+def _load_profile(path: pathlib.Path, use_cache: bool) -> CompiledProfile:
+    data = path.read_bytes()
+    if use_cache:
+        from advanced_filter.core.profile_cache import get_compiled_profile
+        return get_compiled_profile(data)
+    return compile_profile(load_config(data))
+
+def _write(result, out_path: pathlib.Path, fmt: str) -> None:
+    import pandas as pd
+    if fmt == "csv":
+        result.to_csv(out_path, index=False, encoding="utf-8-sig")
+    elif fmt == "split":
+        from advanced_filter.io.excel_io import write_output
+        write_output(
+            result[result["decision"] == "INCLUI"],
+            result[result["decision"] == "REVISA"],
+            result[result["decision"] == "EXCLUI"],
+            str(out_path),
+        )
+    else:
+        with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
+            result.to_excel(writer, index=False, sheet_name="Resultado")
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="filtro-avancado",
+        description="Aplica perfis do Filtro Avançado a planilhas CSV/Excel, sem interface.",
+    )
+    ap.add_argument("inputs", nargs="+", help="arquivos de entrada (.csv, .xlsx, .xlsm, .xls)")
+    ap.add_argument("--sheet", default=None, help="aba do Excel (padrão: a primeira)")
+    ap.add_argument("--col", required=True, help="coluna de texto a filtrar")
+    ap.add_argument("-p", "--profile", action="append", required=True,
+                    help="perfil YAML (repita para aplicar vários)")
+    ap.add_argument("--format", choices=FORMATS, default="xlsx",
+                    help="xlsx = aba única; split = abas Incluidos/Revisar/Excluidos; csv")
+    ap.add_argument("--out-dir", default=None, help="pasta de saída (padrão: a da entrada)")
+    ap.add_argument("--chunk-size", type=int, default=10_000, help="linhas por bloco do engine")
+    ap.add_argument("--workers", type=int, default=1, help="blocos em paralelo (1 = serial)")
+    ap.add_argument("--executor", choices=EXECUTORS, default="process",
+                    help="process = pool de processos; thread = pool de threads (sem pickle/spawn)")
+    ap.add_argument("--dedup", action="store_true", help="casa textos repetidos uma única vez")
+    ap.add_argument("--mode", choices=MODES, default="full",
+                    help="full = decisão + auditoria; decision = só a coluna decision (mais rápido)")
+    ap.add_argument("--no-cache", action="store_true", help="não usa o cache de perfis compilados")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="lê, filtra e grava em paralelo, bloco a bloco (arquivos grandes)")
+    ap.add_argument("--queue-depth", type=int, default=4,
+                    help="blocos em voo entre os estágios do --pipeline")
+    return ap
+
+def _run_pipelined(args, profiles, out_dir: Optional[pathlib.Path], ext: str) -> int:
+    from advanced_filter.io.pipeline import run_pipeline
+    failed = 0
+    for inp in args.inputs:
+        src = pathlib.Path(inp)
+        for name, profile in profiles:
+            out_path = (out_dir or src.parent) / f"{src.stem}__{name}.{ext}"
+            try:
+                st = run_pipeline(str(src), args.col, profile, str(out_path), fmt=args.format,
+                                  sheet=args.sheet, chunk_rows=args.chunk_size, queue_depth=args.queue_depth,
+                                  engine_threads=args.workers, mode=args.mode, dedup=args.dedup)
+            except Exception as e:
+                print(f"[erro] {src} × {name}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            n, wall = st["rows"], st["wall_s"]
+            counts = st["counts"]
+            print(
+                f"{src.name} × {name}: {n} linhas em {wall:.2f}s ({n / wall if wall > 0 else 0:,.0f} linhas/s) | "
+                f"ocupado: leitura {st['read_s']:.2f}s, engine {st['engine_s']:.2f}s, escrita {st['write_s']:.2f}s | "
+                f"INCLUI={counts.get('INCLUI', 0)} REVISA={counts.get('REVISA', 0)} "
+                f"EXCLUI={counts.get('EXCLUI', 0)} -> {out_path}"
+            )
+    return 1 if failed else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from advanced_filter.io.excel_io import read_table
+
+    out_dir = pathlib.Path(args.out_dir) if args.out_dir else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    ext = "csv" if args.format == "csv" else "xlsx"
+
+    profiles = []
+    for p in args.profile:
+        path = pathlib.Path(p)
+        t0 = time.perf_counter()
+        try:
+            profiles.append((path.stem, _load_profile(path, not args.no_cache)))
+        except Exception as e:
+            print(f"[erro] perfil {path}: {e}", file=sys.stderr)
+            return 2
+        print(f"perfil {path.name}: {time.perf_counter() - t0:.2f}s para carregar/compilar")
+
+    if args.pipeline:
+        return _run_pipelined(args, profiles, out_dir, ext)
+
+    failed = 0
+    total_rows, total_secs = 0, 0.0
+    for inp in args.inputs:
+        src = pathlib.Path(inp)
+        t0 = time.perf_counter()
+        try:
+            df = read_table(str(src), args.sheet)
+        except Exception as e:
+            print(f"[erro] leitura {src}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        t_read = time.perf_counter() - t0
+        if args.col not in df.columns:
+            print(f"[erro] {src}: coluna '{args.col}' não encontrada", file=sys.stderr)
+            failed += 1
+            continue
+
+        for name, profile in profiles:
+            out_path = (out_dir or src.parent) / f"{src.stem}__{name}.{ext}"
+            try:
+                t1 = time.perf_counter()
+                result = run_filter(df, args.col, profile, chunk_size=args.chunk_size,
+                                    dedup=args.dedup, workers=args.workers, mode=args.mode,
+                                    executor=args.executor)
+                t_run = time.perf_counter() - t1
+                t2 = time.perf_counter()
+                _write(result, out_path, args.format)
+                t_write = time.perf_counter() - t2
+            except Exception as e:
+                print(f"[erro] {src} × {name}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+
+            n = len(df)
+            counts = result["decision"].value_counts().to_dict()
+            total_rows += n
+            total_secs += t_run
+            print(
+                f"{src.name} × {name}: {n} linhas | leitura {t_read:.2f}s, engine {t_run:.2f}s "
+                f"({n / t_run if t_run > 0 else 0:,.0f} linhas/s), escrita {t_write:.2f}s | "
+                f"INCLUI={counts.get('INCLUI', 0)} REVISA={counts.get('REVISA', 0)} "
+                f"EXCLUI={counts.get('EXCLUI', 0)} -> {out_path}"
+            )
+
+    if total_secs > 0:
+        print(f"total: {total_rows} linhas no engine em {total_secs:.2f}s "
+              f"({total_rows / total_secs:,.0f} linhas/s)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
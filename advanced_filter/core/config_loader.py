@@ -7,12 +7,13 @@ version: basic-1            # opcional (default basic-1)
 normalization:
   lowercase: true
   strip_accents: true
+  expand_plurals: false     # acrescenta variantes singular/plural (PT-BR) dos termos
 window: 8                   # janela de proximidade (em tokens)
 require_context: false      # exige contexto para decidir
 negative_wins_ties: true    # em empate, negativo vence
 min_pos_to_include: 1
 min_neg_to_exclude: 1
-positives:                  # lista de strings (palavras ou frases)
+positives:                  # lista de strings (palavras, frases ou "prefixo*")
   - termo1
 negatives:
   - termo2
@@ -21,8 +22,22 @@ contexts:
 """
 from __future__ import annotations
 from typing import Any, Dict, List
+from collections import OrderedDict
+import hashlib
+import threading
 import yaml
 
+# libyaml (C) quando disponível: ~5-10x mais rápido em perfis com listas grandes
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:  # PyYAML sem libyaml
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+# Memo de load_config por hash dos bytes (a UI reprocessa o mesmo YAML a cada interação)
+_MEMO_SIZE = 32
+_memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memo_lock = threading.Lock()
+
 # -------- Helpers --------
 def _as_bool(x, default: bool) -> bool:
     if isinstance(x, bool):
@@ -65,13 +80,38 @@ def _as_list_str(x) -> List[str]:
     return out
 
 # -------- Loader --------
+def _copy_cfg(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Cópia própria para o chamador (listas e normalization novas; strings são imutáveis)."""
+    out = dict(cfg)
+    out["normalization"] = dict(cfg["normalization"])
+    for k in ("positives", "negatives", "contexts"):
+        out[k] = list(cfg[k])
+    return out
+
 def load_config(yaml_bytes: bytes) -> Dict[str, Any]:
     """
     Carrega bytes YAML e normaliza para o dicionário do modo básico.
     Não há suporte a versões antigas; essa é a ÚNICA fonte de verdade.
     """
+    key = hashlib.sha256(yaml_bytes).hexdigest() if isinstance(yaml_bytes, (bytes, bytearray)) else None
+    if key is not None:
+        with _memo_lock:
+            cached = _memo.get(key)
+            if cached is not None:
+                _memo.move_to_end(key)
+                return _copy_cfg(cached)
+
+    cfg = _parse_config(yaml_bytes)
+    if key is not None:
+        with _memo_lock:
+            _memo[key] = _copy_cfg(cfg)
+            while len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+    return cfg
+
+def _parse_config(yaml_bytes: bytes) -> Dict[str, Any]:
     try:
-        raw = yaml.safe_load(yaml_bytes.decode('utf-8')) if isinstance(yaml_bytes, (bytes, bytearray)) else {}
+        raw = yaml.load(yaml_bytes.decode('utf-8'), Loader=_Loader) if isinstance(yaml_bytes, (bytes, bytearray)) else {}
         if raw is None:
             raw = {}
     except Exception:
@@ -83,6 +123,7 @@ def load_config(yaml_bytes: bytes) -> Dict[str, Any]:
         "normalization": {
             "lowercase": _as_bool(norm.get("lowercase"), True),
             "strip_accents": _as_bool(norm.get("strip_accents"), True),
+            "expand_plurals": _as_bool(norm.get("expand_plurals"), False),
         },
         "window": _as_int_pos(raw.get("window"), 8),
         "require_context": _as_bool(raw.get("require_context"), False),
@@ -107,6 +148,7 @@ def config_dict_to_yaml_bytes(cfg: Dict[str, Any]) -> bytes:
         "normalization": {
             "lowercase": bool(cfg.get("normalization", {}).get("lowercase", True)),
             "strip_accents": bool(cfg.get("normalization", {}).get("strip_accents", True)),
+            "expand_plurals": bool(cfg.get("normalization", {}).get("expand_plurals", False)),
         },
         "window": int(cfg.get("window", 8)),
         "require_context": bool(cfg.get("require_context", False)),
@@ -117,6 +159,6 @@ def config_dict_to_yaml_bytes(cfg: Dict[str, Any]) -> bytes:
         "negatives": list(cfg.get("negatives") or []),
         "contexts":  list(cfg.get("contexts") or []),
     }
-    return yaml.safe_dump(serial, allow_unicode=True, sort_keys=False).encode("utf-8")
+    return yaml.dump(serial, Dumper=_Dumper, allow_unicode=True, sort_keys=False).encode("utf-8")
 
 __all__ = ["load_config", "config_dict_to_yaml_bytes"]
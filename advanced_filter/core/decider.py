@@ -1,13 +1,66 @@
 from __future__ import annotations
-from typing import Dict, Any
-from .dsl import DSLContext, eval_equation
+from typing import Dict, Any, List, Optional
+import time
+from .dsl import DSLContext, compile_equation
 
-def apply_rules(equations, scores, ctx: DSLContext, cfg):
+class RuleStats:
+    """
+    Estatísticas por regra acumuladas ao longo de uma execução (para profiling):
+    quantas vezes foi avaliada, pulada (classe de span exigida vazia), verdadeira,
+    disparada (venceu o first-match) e o tempo total de avaliação.
+    """
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, float]] = {}
+
+    def _get(self, name: str) -> Dict[str, float]:
+        st = self.rules.get(name)
+        if st is None:
+            st = {"evaluated": 0, "skipped": 0, "true": 0, "fired": 0, "seconds": 0.0}
+            self.rules[name] = st
+        return st
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Uma linha por regra, ordenada pelo custo total (mais caras primeiro)."""
+        rows = []
+        for name, st in self.rules.items():
+            seen = st["evaluated"] + st["skipped"]
+            rows.append({
+                "rule": name,
+                **st,
+                "hit_rate": (st["true"] / seen) if seen else 0.0,
+                "avg_us": (st["seconds"] / st["evaluated"] * 1e6) if st["evaluated"] else 0.0,
+            })
+        rows.sort(key=lambda r: r["seconds"], reverse=True)
+        return rows
+
+def apply_rules(equations, scores, ctx: DSLContext, cfg, stats: Optional[RuleStats] = None):
+    """
+    Avalia as regras em ordem e devolve a primeira que dispara (first-match).
+    Regras cujas classes de span exigidas (ex.: POS em `ANY(POS()) and ...`) estão vazias
+    nesta linha são puladas sem avaliar a equação — seriam False de qualquer forma,
+    então o resultado é idêntico à avaliação completa.
+    """
     for rule in equations:
-        ok = eval_equation(rule["equation"], ctx)
+        # compile_equation é memoizado: parse/validação só na 1ª vez de cada equação
+        eq = compile_equation(rule["equation"])
+        st = stats._get(rule["name"]) if stats is not None else None
+        if not eq.can_match(ctx):
+            if st is not None:
+                st["skipped"] += 1
+            continue
+        if st is None:
+            ok = eq(ctx)
+        else:
+            t0 = time.perf_counter()
+            ok = eq(ctx)
+            st["seconds"] += time.perf_counter() - t0
+            st["evaluated"] += 1
+            st["true"] += int(ok)
         if ok:
             if rule.get("min_score") is not None and scores["total"] < float(rule["min_score"]):
                 continue
+            if st is not None:
+                st["fired"] += 1
             return {
                 "rule_fired": rule["name"],
                 "decision": rule["decision"],
@@ -1,16 +1,34 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict
-from .resolver import within_tokens, within_sentence
+from typing import List, Tuple, Dict, Callable, Optional, FrozenSet, Union
+from functools import lru_cache
+import ast
+from .preprocessor import TokenizedText
+from .resolver import within_tokens, within_segment, TokenBounds
 
 Span = Tuple[int,int]
 
 class DSLContext:
-    def __init__(self, text: str, pos_spans: List[Span], neg_spans: List[Span], ctx_spans: Dict[str, List[Span]]):
-        self.text = text
+    def __init__(self, text: Union[str, TokenizedText], pos_spans: List[Span], neg_spans: List[Span], ctx_spans: Dict[str, List[Span]]):
+        # aceita o TokenizedText da linha (já tokenizado pelo engine) ou o texto puro
+        self.tokenized = text if isinstance(text, TokenizedText) else TokenizedText(text)
+        self.text = self.tokenized.text
         self.pos_spans = pos_spans
         self.neg_spans = neg_spans
         self.ctx_spans = ctx_spans
 
+    @property
+    def token_bounds(self) -> TokenBounds:
+        """(starts, ends) dos tokens, construídos uma única vez por texto."""
+        return self.tokenized.starts, self.tokenized.ends
+
+    def segment_starts(self, scope: str) -> List[int]:
+        """Inícios ordenados das sentenças/parágrafos, calculados uma única vez por escopo."""
+        if scope == "sentence":
+            return self.tokenized.sentence_starts
+        if scope == "paragraph":
+            return self.tokenized.paragraph_starts
+        raise ValueError("scope inválido")
+
     def POS(self) -> List[Span]:
         return self.pos_spans
     def NEG(self) -> List[Span]:
@@ -18,30 +36,125 @@ class DSLContext:
     def CTX(self, name: str) -> List[Span]:
         return self.ctx_spans.get(name, [])
 
+    def has_spans(self, span_class: str) -> bool:
+        """"POS", "NEG" ou "CTX:<nome>" tem algum span nesta linha?"""
+        if span_class == "POS":
+            return bool(self.pos_spans)
+        if span_class == "NEG":
+            return bool(self.neg_spans)
+        return bool(self.ctx_spans.get(span_class[4:]))
+
     @staticmethod
     def ANY(spans: List[Span]) -> bool:
         return bool(spans)
 
     def WITHIN(self, n: int, spansA: List[Span], spansB: List[Span], scope: str = "tokens") -> bool:
         if scope == "tokens":
-            return within_tokens(self.text, spansA, spansB, n)
-        elif scope == "sentence":
-            return within_sentence(self.text, spansA, spansB)
-        elif scope == "paragraph":
-            return within_sentence(self.text, spansA, spansB)
+            return within_tokens(self.text, spansA, spansB, n, bounds=self.token_bounds)
+        elif scope in ("sentence", "paragraph"):
+            return within_segment(spansA, spansB, self.segment_starts(scope), len(self.text))
         else:
             raise ValueError("scope inválido")
 
+# ---------- Compilação das equações ----------
+# Nomes que a DSL pode referenciar (na ordem dos argumentos da função compilada)
+ALLOWED_NAMES = ("POS", "NEG", "CTX", "ANY", "WITHIN")
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+    ast.Call, ast.Name, ast.Load, ast.Constant, ast.keyword,
+)
+
+class CompiledEquation:
+    """
+    Equação validada e compilada uma única vez; chamar com um DSLContext.
+    `requires` = classes de spans ("POS", "NEG", "CTX:<nome>") que precisam ser não vazias
+    para a equação poder ser verdadeira (se alguma estiver vazia, o resultado é False).
+    """
+    __slots__ = ("source", "requires", "_fn")
+
+    def __init__(self, source: str, fn: Callable[..., object], requires: FrozenSet[str] = frozenset()):
+        self.source = source
+        self.requires = requires
+        self._fn = fn
+
+    def can_match(self, ctx: DSLContext) -> bool:
+        return all(ctx.has_spans(c) for c in self.requires)
+
+    def __call__(self, ctx: DSLContext) -> bool:
+        return bool(self._fn(ctx.POS, ctx.NEG, ctx.CTX, ctx.ANY, ctx.WITHIN))
+
+    def __repr__(self) -> str:
+        return f"CompiledEquation({self.source!r})"
+
+def _validate(tree: ast.AST, equation: str) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Construção não permitida na equação ({type(node).__name__}): {equation}")
+        if isinstance(node, ast.Name) and node.id not in ALLOWED_NAMES:
+            raise ValueError(f"Nome não permitido na equação ({node.id}): {equation}")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            raise ValueError(f"Só é possível chamar {', '.join(ALLOWED_NAMES)}: {equation}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (bool, int, float, str, type(None))):
+            raise ValueError(f"Constante não permitida na equação: {equation}")
+
+def _span_class(node: ast.AST) -> Optional[str]:
+    """POS() -> "POS", NEG() -> "NEG", CTX("x") -> "CTX:x"; qualquer outra coisa -> None."""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+        return None
+    name = node.func.id
+    if name in ("POS", "NEG") and not node.args:
+        return name
+    if name == "CTX" and len(node.args) == 1 and isinstance(node.args[0], ast.Constant) \
+            and isinstance(node.args[0].value, str):
+        return f"CTX:{node.args[0].value}"
+    return None
+
+def _required_classes(node: ast.AST) -> FrozenSet[str]:
+    """Classes de spans sem as quais a (sub)expressão não pode ser verdadeira."""
+    if isinstance(node, ast.BoolOp):
+        parts = [_required_classes(v) for v in node.values]
+        if isinstance(node.op, ast.And):
+            return frozenset().union(*parts)
+        return frozenset.intersection(*parts)
+    cls = _span_class(node)
+    if cls is not None:                       # lista de spans usada como booleano
+        return frozenset([cls])
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.func.id == "ANY" and len(node.args) == 1:
+            cls = _span_class(node.args[0])
+            return frozenset([cls]) if cls else frozenset()
+        if node.func.id == "WITHIN":          # WITHIN com qualquer lado vazio é False
+            kw = {k.arg: k.value for k in node.keywords}
+            sides = list(node.args[1:3]) + [kw[k] for k in ("spansA", "spansB") if k in kw]
+            return frozenset(c for c in map(_span_class, sides) if c)
+    return frozenset()
+
+@lru_cache(maxsize=1024)
+def compile_equation(equation: str) -> CompiledEquation:
+    """
+    Faz o parse da equação em AST, valida contra a whitelist (POS, NEG, CTX, ANY, WITHIN)
+    e compila para uma função `lambda POS, NEG, CTX, ANY, WITHIN: <equação>`.
+    O resultado fica em cache por texto da equação.
+    """
+    if not isinstance(equation, str) or not equation.strip():
+        raise ValueError("Equação vazia.")
+    try:
+        tree = ast.parse(equation.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Equação inválida: {equation} ({e.msg})") from None
+    _validate(tree, equation)
+
+    args = ast.arguments(
+        posonlyargs=[],
+        args=[ast.arg(arg=name) for name in ALLOWED_NAMES],
+        kwonlyargs=[], kw_defaults=[], defaults=[],
+    )
+    lam = ast.Expression(body=ast.Lambda(args=args, body=tree.body))
+    ast.fix_missing_locations(lam)
+    code = compile(lam, "<dsl>", "eval")
+    fn = eval(code, {"__builtins__": {}}, {})
+    return CompiledEquation(equation, fn, _required_classes(tree.body))
+
 def eval_equation(equation: str, ctx: DSLContext) -> bool:
-    safe_globals = {
-        "__builtins__": {},
-        "POS": ctx.POS,
-        "NEG": ctx.NEG,
-        "CTX": ctx.CTX,
-        "ANY": ctx.ANY,
-        "WITHIN": ctx.WITHIN,
-        "True": True,
-        "False": False,
-        "None": None,
-    }
-    return bool(eval(equation, safe_globals, {}))
+    return compile_equation(equation)(ctx)
@@ -1,22 +1,56 @@
 ﻿# -*- coding: utf-8 -*-
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple, Iterable, Union
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Tuple, Iterable, Iterator, Optional, Union, Sequence
+from array import array
+from bisect import bisect_right
 import re
-import pandas as pd
+import numpy as np
+
+if TYPE_CHECKING:  # run_filter só usa métodos do DataFrame recebido; pandas fica fora do import
+    import pandas as pd
 
 try:
     from .config_loader import load_config
+    from .preprocessor import TokenizedText
+    from .term_index import TermIndex, CandidateFilter, term_pattern, expand_plurals, hits_to_arrays
 except Exception:
     from config_loader import load_config
+    from preprocessor import TokenizedText
+    from term_index import TermIndex, CandidateFilter, term_pattern, expand_plurals, hits_to_arrays
+
+try:
+    from ..logs.metrics import timed, inc as _metric_inc
+except Exception:  # engine usado fora do pacote: métricas viram no-op
+    from contextlib import nullcontext as _nullcontext
+
+    def timed(name: str):
+        return _nullcontext()
+
+    def _metric_inc(name: str, value: float = 1) -> None:
+        pass
+
+# Versão do engine/formato do perfil compilado: incrementar quando a compilação ou a
+# semântica de matching mudar (invalida caches de perfis e de resultados).
+ENGINE_VERSION = "5"
 
 # ---------- Normalização ----------
+_ACCENT_TABLE: Optional[Dict[int, str]] = None  # Latin-1/Latin Extended -> unidecode, p/ str.translate
+
 def _strip_accents(s: str) -> str:
+    global _ACCENT_TABLE
+    if s.isascii():
+        return s  # unidecode não altera ASCII
     try:
         from unidecode import unidecode
-        return unidecode(s)
     except Exception:
         import unicodedata
         return ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
+    # unidecode troca caractere a caractere: a tabela cobre o português em C e só o que
+    # sobrar fora de ASCII passa pelo unidecode (resultado idêntico)
+    if _ACCENT_TABLE is None:
+        _ACCENT_TABLE = {cp: unidecode(chr(cp)) for cp in range(0x80, 0x250)}
+    t = s.translate(_ACCENT_TABLE)
+    return t if t.isascii() else unidecode(t)
 
 def normalize_text(s: str, lowercase: bool = True, strip_accents: bool = True) -> str:
     if not isinstance(s, str):
@@ -29,55 +63,155 @@ def normalize_text(s: str, lowercase: bool = True, strip_accents: bool = True) -
 
 # ---------- Compilação de padrões ----------
 def _compile_term(term: str) -> re.Pattern:
-    t = term.strip()
-    if not t:
-        return re.compile(r"$^")
-    if " " in t:
-        return re.compile(re.escape(t))       # frase = substring
-    else:
-        return re.compile(r"\b" + re.escape(t) + r"\b")  # palavra isolada
+    # palavra isolada (\bx\b), frase = substring, "prefixo*" / "*" = \w* (ver term_index)
+    return term_pattern(term)
 
 def compile_terms(terms: Iterable[str]) -> List[re.Pattern]:
     return [_compile_term(t) for t in (terms or []) if isinstance(t, str) and t.strip()]
 
-# ---------- Indexação de tokens ----------
-_word_re = re.compile(r"\w+")
-
-def _word_starts(text: str) -> List[int]:
-    return [m.start() for m in _word_re.finditer(text)]
+class TermSet:
+    """
+    Termos normalizados de uma classe (positivos, negativos ou contextos).
+    O índice na lista é o term_id usado nos matches; o texto só é resolvido na saída.
+    Com `expand_plurals`, as variantes singular/plural entram no fim da lista.
+    """
+    __slots__ = ("terms",)
+
+    def __init__(self, terms: Iterable[str], plurals: bool = False):
+        self.terms: List[str] = [t.strip() for t in (terms or []) if isinstance(t, str) and t.strip()]
+        if plurals:
+            self.terms = expand_plurals(self.terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+class CompiledProfile:
+    """Configuração + termos já normalizados e compilados (reutilizável entre execuções)."""
+
+    def __init__(self, cfg: Dict[str, Any]):
+        norm_opts = cfg.get("normalization", {}) or {}
+        self.cfg = cfg
+        self.lowercase = bool(norm_opts.get("lowercase", True))
+        self.strip_accents = bool(norm_opts.get("strip_accents", True))
+        self.expand_plurals = bool(norm_opts.get("expand_plurals", False))
+        self.window = int(cfg.get("window", 8))
+
+        def _norm_terms(terms):
+            return [normalize_text(t, lowercase=self.lowercase, strip_accents=self.strip_accents) for t in (terms or [])]
+
+        self.positives = TermSet(_norm_terms(cfg.get("positives")), self.expand_plurals)
+        self.negatives = TermSet(_norm_terms(cfg.get("negatives")), self.expand_plurals)
+        self.contexts = TermSet(_norm_terms(cfg.get("contexts")), self.expand_plurals)
+        # trie única para as três classes
+        self.index = TermIndex([self.positives.terms, self.negatives.terms, self.contexts.terms])
+        self._prefilters: Dict[Tuple[int, ...], CandidateFilter] = {}
+
+    def normalize(self, text: str) -> str:
+        return normalize_text(text, lowercase=self.lowercase, strip_accents=self.strip_accents)
+
+    def prefilter(self, classes: Tuple[int, ...] = (0, 1, 2)) -> CandidateFilter:
+        """Pré-filtro de linhas candidatas para as classes (0=pos, 1=neg, 2=ctx); ver compile_profile."""
+        f = self._prefilters.get(classes)
+        if f is None:
+            f = self._prefilters[classes] = self.index.candidate_filter(classes)
+        return f
+
+    def match(self, text_norm: "TextLike") -> Tuple["Matches", "Matches", "Matches"]:
+        """(positivos, negativos, contextos) de um texto já normalizado, numa passada só."""
+        tt = text_norm if isinstance(text_norm, TokenizedText) else TokenizedText(text_norm)
+        pos, neg, ctx = self.index.match(tt)
+        return Matches(*hits_to_arrays(pos)), Matches(*hits_to_arrays(neg)), Matches(*hits_to_arrays(ctx))
+
+def compile_profile(cfg: Dict[str, Any]) -> CompiledProfile:
+    prof = CompiledProfile(cfg)
+    # pré-filtros dos dois modos montados já na compilação: entram no pickle do
+    # profile_cache e o custo não cai na 1ª classificação
+    prof.prefilter((0, 1, 2))
+    prof.prefilter((0, 1))
+    return prof
 
-def _char_to_token_index(char_idx: int, word_starts: List[int]) -> int:
-    import bisect
-    return bisect.bisect_right(word_starts, char_idx)
+# ---------- Indexação de tokens ----------
+# A tokenização (\w+) vive em TokenizedText: uma única passada por linha, compartilhada
+# por matching, proximidade, DSL e realce.
+TextLike = Union[str, TokenizedText]
 
-def _token_distance(a_char: int, b_char: int, word_starts: List[int]) -> int:
-    ai = _char_to_token_index(a_char, word_starts)
-    bi = _char_to_token_index(b_char, word_starts)
-    return abs(ai - bi)
+def _word_starts(text: str) -> Sequence[int]:
+    return TokenizedText(text).starts
 
 # ---------- Matching ----------
-def find_matches(text_norm: str, patterns: List[re.Pattern]) -> List[Tuple[int, int, str]]:
-    out: List[Tuple[int, int, str]] = []
-    for rgx in patterns:
-        for m in rgx.finditer(text_norm):
-            out.append((m.start(), m.end(), m.group(0)))
-    out.sort(key=lambda x: x[0])
-    return out
-
-def any_near(a_matches, b_matches, k_tokens: int, word_starts: List[int]) -> bool:
+class Matches:
+    """
+    Matches de uma classe numa linha, como arrays int32 paralelos (start, end, term_id),
+    ordenados por start. Iterar devolve tuplas (start, end, term_id).
+    """
+    __slots__ = ("starts", "ends", "term_ids")
+
+    def __init__(self, starts: Optional[array] = None, ends: Optional[array] = None, term_ids: Optional[array] = None):
+        self.starts = starts if starts is not None else array("i")
+        self.ends = ends if ends is not None else array("i")
+        self.term_ids = term_ids if term_ids is not None else array("i")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.starts, self.ends, self.term_ids)
+
+_NO_MATCHES = Matches()
+
+def find_matches(text_norm: TextLike, patterns: List[re.Pattern]) -> Matches:
+    text = text_norm.text if isinstance(text_norm, TokenizedText) else text_norm
+    starts, ends, tids = array("i"), array("i"), array("i")
+    groups = 0
+    for tid, rgx in enumerate(patterns):
+        n0 = len(starts)
+        for m in rgx.finditer(text):
+            s, e = m.span()
+            starts.append(s)
+            ends.append(e)
+            tids.append(tid)
+        groups += len(starts) > n0
+    if groups > 1:
+        # ordena por start (estável: empates mantêm a ordem dos termos)
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        starts = array("i", [starts[i] for i in order])
+        ends = array("i", [ends[i] for i in order])
+        tids = array("i", [tids[i] for i in order])
+    return Matches(starts, ends, tids)
+
+def _match_starts(matches) -> Sequence[int]:
+    if isinstance(matches, Matches):
+        return matches.starts
+    return [m[0] for m in matches]
+
+def any_near(a_matches, b_matches, k_tokens: int, word_starts: Union[TokenizedText, Sequence[int]]) -> bool:
+    """Algum match de A está a <= k_tokens tokens de algum match de B? (merge linear)"""
     if not a_matches or not b_matches:
         return False
-    for sa, ea, _ in a_matches:
-        for sb, eb, _ in b_matches:
-            if _token_distance(sa, sb, word_starts) <= k_tokens:
-                return True
+    if isinstance(word_starts, TokenizedText):
+        word_starts = word_starts.starts
+    ta = sorted(bisect_right(word_starts, s) for s in _match_starts(a_matches))
+    tb = sorted(bisect_right(word_starts, s) for s in _match_starts(b_matches))
+    i = j = 0
+    while i < len(ta) and j < len(tb):
+        if abs(ta[i] - tb[j]) <= k_tokens:
+            return True
+        if ta[i] < tb[j]:
+            i += 1
+        else:
+            j += 1
     return False
 
-def _unique_terms(matches: List[Tuple[int, int, str]], limit: int = 50) -> str:
-    """Termos únicos (normalizados) separados por ' | ' para auditoria."""
+def _unique_terms(term_ids: Sequence[int], terms: Sequence[str], limit: int = 50) -> str:
+    """Termos únicos (normalizados) separados por ' | ' para auditoria; texto resolvido via term_id."""
     seen = []
     seen_set = set()
-    for _, _, t in matches:
+    seen_ids = set()
+    for tid in term_ids:
+        if tid in seen_ids:
+            continue
+        seen_ids.add(tid)
+        t = terms[tid]
         if t not in seen_set:
             seen.append(t)
             seen_set.add(t)
@@ -85,6 +219,124 @@ def _unique_terms(matches: List[Tuple[int, int, str]], limit: int = 50) -> str:
             break
     return " | ".join(seen)
 
+# ---------- Matches de um bloco em CSR + proximidade vetorizada ----------
+class MatchStore:
+    """
+    Matches de UMA classe para um bloco de linhas, em formato CSR: os matches da linha r
+    ocupam [indptr[r], indptr[r+1]) em starts/ends/term_ids (int32). `tokens` (posição de
+    cada match em tokens, na régua da janela) é preenchido por `_assign_tokens`.
+    """
+    __slots__ = ("indptr", "starts", "ends", "term_ids", "tokens")
+
+    def __init__(self):
+        self.indptr = array("q", [0])
+        self.starts = array("i")
+        self.ends = array("i")
+        self.term_ids = array("i")
+        self.tokens: Optional[np.ndarray] = None
+
+    def append(self, m: Matches) -> None:
+        self.starts.extend(m.starts)
+        self.ends.extend(m.ends)
+        self.term_ids.extend(m.term_ids)
+        self.indptr.append(len(self.starts))
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def counts(self) -> np.ndarray:
+        return np.diff(np.frombuffer(self.indptr, dtype=np.int64))
+
+    def row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows, dtype=np.int64), self.counts())
+
+    def row_term_ids(self, r: int) -> Sequence[int]:
+        return self.term_ids[self.indptr[r]:self.indptr[r + 1]]
+
+def _assign_tokens(stores: Sequence[MatchStore], word_starts: array, word_indptr: array, text_base: np.ndarray) -> None:
+    """
+    Converte o start (char) de cada match na posição em tokens dentro da sua linha, para o
+    bloco inteiro de uma vez: offsets de char e de palavra são deslocados por linha e um
+    único np.searchsorted substitui o bisect por match.
+    """
+    w_indptr = np.frombuffer(word_indptr, dtype=np.int64)
+    words = np.frombuffer(word_starts, dtype=np.int32).astype(np.int64)
+    words += np.repeat(text_base, np.diff(w_indptr))
+    for st in stores:
+        counts = st.counts()
+        g = np.frombuffer(st.starts, dtype=np.int32).astype(np.int64) + np.repeat(text_base, counts)
+        st.tokens = np.searchsorted(words, g, side="right") - np.repeat(w_indptr[:-1], counts)
+
+def near_rows(a: MatchStore, b: MatchStore, k_tokens: int) -> np.ndarray:
+    """
+    Para cada linha do bloco: algum match de A está a <= k_tokens tokens de algum match de B?
+    Equivale a `any_near` linha a linha. Cada match vira a chave linha*stride + token (stride
+    maior que qualquer distância válida, então linhas diferentes nunca ficam "próximas");
+    um np.searchsorted de A contra B acha o vizinho de B mais próximo de cada match de A.
+    """
+    out = np.zeros(a.n_rows, dtype=bool)
+    if not len(a.starts) or not len(b.starts):
+        return out
+    a_rows, b_rows = a.row_ids(), b.row_ids()
+    stride = int(max(a.tokens.max(), b.tokens.max())) + k_tokens + 1
+    ka = a_rows * stride + a.tokens
+    kb = b_rows * stride + b.tokens  # já ordenado: linhas em ordem, matches por start
+    idx = np.searchsorted(kb, ka)
+    hi = kb[np.minimum(idx, len(kb) - 1)]
+    lo = kb[np.maximum(idx - 1, 0)]
+    near = (np.abs(hi - ka) <= k_tokens) | (np.abs(ka - lo) <= k_tokens)
+    out[a_rows[near]] = True
+    return out
+
+def _scan_chunk(texts: Sequence[Any], profile: CompiledProfile,
+                stop: Optional[Callable] = None) -> Tuple[MatchStore, MatchStore, MatchStore, Dict[int, str]]:
+    """
+    Normaliza, tokeniza e casa um bloco de linhas; proximidade já resolvida em `tokens`.
+    O bloco inteiro é normalizado e passa pelo pré-filtro antes: linhas sem nenhum termo
+    candidato entram nos stores sem matches (viram NO_SIGNALS) sem tokenizar nem casar.
+    Com `stop` (modo só-decisão), linhas cuja decisão ficou definida no meio da varredura
+    vão para o 4º item {linha: decisão} e entram nos stores sem matches.
+    """
+    pos, neg, ctx = MatchStore(), MatchStore(), MatchStore()
+    settled: Dict[int, str] = {}
+    word_starts, word_indptr = array("i"), array("q", [0])
+    text_base = np.zeros(len(texts), dtype=np.int64)
+    base = 0
+    norm = [profile.normalize("" if text is None else str(text)) for text in texts]
+    # só-decisão: contexto sem positivo/negativo não muda nada (P == N == 0)
+    keep = profile.prefilter((0, 1) if stop is not None else (0, 1, 2)).mask(norm)
+    skipped = 0
+    for r, text in enumerate(norm):
+        if not keep[r]:
+            pos.append(_NO_MATCHES)
+            neg.append(_NO_MATCHES)
+            ctx.append(_NO_MATCHES)
+            word_indptr.append(len(word_starts))
+            skipped += 1
+            continue
+        tt = TokenizedText(text)
+        if stop is not None:
+            hits, decided = profile.index.match_until(tt, stop)
+            if decided:
+                settled[r] = decided
+                hits = [[], [], []]
+            pm, nm, cm = (Matches(*hits_to_arrays(h)) for h in hits)
+        else:
+            pm, nm, cm = profile.match(tt)
+        pos.append(pm)
+        neg.append(nm)
+        ctx.append(cm)
+        if len(profile.contexts):
+            word_starts.extend(tt.starts)
+            word_indptr.append(len(word_starts))
+            text_base[r] = base
+            base += len(tt.text) + 1
+    if len(profile.contexts):
+        _assign_tokens((pos, neg, ctx), word_starts, word_indptr, text_base)
+    _metric_inc("engine.prefiltered", skipped)
+    return pos, neg, ctx, settled
+
 # ---------- Decisão (com Opção A e mesma estrutura antiga) ----------
 def decide_basic(P: int, N: int, Cpos: bool, Cneg: bool, cfg: Dict[str, Any]) -> Tuple[str, str]:
     """
@@ -152,6 +404,108 @@ def decide_basic(P: int, N: int, Cpos: bool, Cneg: bool, cfg: Dict[str, Any]) ->
         return "REVISA", "NEG_BELOW_MIN"
     return "REVISA", "WEAK_SIGNALS"
 
+# ---------- Decisão vetorizada (todas as linhas de uma vez) ----------
+# reason_code -> decision (mesma tabela de decide_basic)
+REASON_DECISION = {
+    "NO_SIGNALS": "EXCLUI",
+    "REQ_CTX_POS_ONLY": "INCLUI",
+    "REQ_CTX_NEG_ONLY": "EXCLUI",
+    "REQ_CTX_POS_NO_CTX": "REVISA",
+    "REQ_CTX_NEG_NO_CTX": "REVISA",
+    "REQ_CTX_TIE_OR_NO_EXCLUSIVE": "REVISA",
+    "REQ_CTX_UNMET": "REVISA",
+    "NEG_ONLY": "EXCLUI",
+    "POS_ONLY": "INCLUI",
+    "TIE_POS_CTX": "INCLUI",
+    "TIE_NEG_CTX": "EXCLUI",
+    "TIE_NO_CTX": "REVISA",
+    "POS_BELOW_MIN": "REVISA",
+    "NEG_BELOW_MIN": "REVISA",
+    "WEAK_SIGNALS": "REVISA",
+}
+
+def decide_vectorized(P, N, Cpos, Cneg, cfg: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Versão vetorizada de `decide_basic` sobre arrays (uma posição por linha).
+    Retorna (decision, reason_code, score_total); as condições seguem a mesma ordem
+    de precedência de `decide_basic`, avaliadas com np.select sobre a coluna inteira.
+    """
+    P = np.asarray(P, dtype=np.int64)
+    N = np.asarray(N, dtype=np.int64)
+    Cpos = np.asarray(Cpos, dtype=bool)
+    Cneg = np.asarray(Cneg, dtype=bool)
+
+    require_ctx = bool(cfg.get("require_context", False))
+    neg_wins = bool(cfg.get("negative_wins_ties", True))
+    minP = int(cfg.get("min_pos_to_include", 1))
+    minN = int(cfg.get("min_neg_to_exclude", 1))
+
+    pos_ok = P >= minP
+    neg_ok = N >= minN
+    rules: List[Tuple[np.ndarray, str]] = [((P == 0) & (N == 0), "NO_SIGNALS")]
+    if require_ctx:
+        rules += [
+            (Cpos & pos_ok & ~Cneg, "REQ_CTX_POS_ONLY"),
+            (Cneg & neg_ok & ~Cpos, "REQ_CTX_NEG_ONLY"),
+            (pos_ok & ~Cpos, "REQ_CTX_POS_NO_CTX"),
+            (neg_ok & ~Cneg, "REQ_CTX_NEG_NO_CTX"),
+            (pos_ok & neg_ok, "REQ_CTX_TIE_OR_NO_EXCLUSIVE"),
+        ]
+        default = "REQ_CTX_UNMET"
+    else:
+        tie = pos_ok & neg_ok
+        rules += [
+            (neg_ok & ~pos_ok, "NEG_ONLY"),
+            (pos_ok & ~neg_ok, "POS_ONLY"),
+            (tie & Cpos & ~Cneg, "TIE_POS_CTX"),
+        ]
+        if neg_wins:
+            rules.append((tie & Cneg & ~Cpos, "TIE_NEG_CTX"))
+        rules += [
+            (tie, "TIE_NO_CTX"),
+            ((P > 0) & (P < minP) & (N == 0), "POS_BELOW_MIN"),
+            ((N > 0) & (N < minN) & (P == 0), "NEG_BELOW_MIN"),
+        ]
+        default = "WEAK_SIGNALS"
+
+    labels = np.array([code for _, code in rules] + [default], dtype=object)
+    idx = np.select([cond for cond, _ in rules], np.arange(len(rules)), default=len(rules))
+    reason_code = labels[idx]
+    decision = np.array([REASON_DECISION[c] for c in labels], dtype=object)[idx]
+    score = (P - N).astype(float)
+    return decision, reason_code, score
+
+# ---------- Modo só-decisão (parada antecipada) ----------
+def decision_settler(profile: CompiledProfile) -> Callable[[Sequence[Sequence[Any]]], Optional[str]]:
+    """
+    `stop(hits)` para TermIndex.match_until: devolve a decisão assim que nenhum estado
+    ainda alcançável da linha (P e N só crescem; Cpos/Cneg ainda podem virar) mudaria o
+    resultado de `decide_basic`; senão None. Os estados são memoizados por classe de
+    (P, N) — só importam P==0, P<minP e P>=minP (idem N).
+    """
+    cfg = profile.cfg
+    minP = max(1, int(cfg.get("min_pos_to_include", 1)))
+    minN = max(1, int(cfg.get("min_neg_to_exclude", 1)))
+    has_pos, has_neg, has_ctx = len(profile.positives) > 0, len(profile.negatives) > 0, len(profile.contexts) > 0
+    memo: Dict[Tuple[int, int], Optional[str]] = {}
+
+    def _state(p: int, q: int) -> Optional[str]:
+        outcomes = set()
+        for P in ({p, max(p, 1), minP} if has_pos else {p}):
+            for N in ({q, max(q, 1), minN} if has_neg else {q}):
+                for cp in ((False, True) if has_ctx and P > 0 else (False,)):
+                    for cn in ((False, True) if has_ctx and N > 0 else (False,)):
+                        outcomes.add(decide_basic(P, N, cp, cn, cfg)[0])
+        return outcomes.pop() if len(outcomes) == 1 else None
+
+    def stop(hits) -> Optional[str]:
+        key = (min(len(hits[0]), minP), min(len(hits[1]), minN))
+        if key not in memo:
+            memo[key] = _state(*key)
+        return memo[key]
+
+    return stop
+
 # ---------- Tradução humana dos motivos ----------
 def _reason_pt(code: str,
                P: int, N: int, minP: int, minN: int,
@@ -195,85 +549,259 @@ def _reason_pt(code: str,
     return short, detail
 
 # ---------- API principal ----------
-CfgSource = Union[bytes, Dict[str, Any]]
+CfgSource = Union[bytes, Dict[str, Any], CompiledProfile]
+
+# colunas acrescentadas por run_filter, na ordem da saída
+RESULT_COLUMNS = (
+    "decision", "decision_reason_code", "decision_reason", "reason_human", "reason_human_detail",
+    "p_count", "n_count", "ctx_count", "near_pos_ctx", "near_neg_ctx", "score_total",
+    "pos_terms", "neg_terms", "ctx_terms",
+)
+
+# mode="decision": só a decisão, sem auditoria
+DECISION_COLUMNS = ("decision",)
+MODES = ("full", "decision")
+EXECUTORS = ("process", "thread")
+
+def resolve_profile(cfg_source: CfgSource) -> CompiledProfile:
+    if isinstance(cfg_source, CompiledProfile):
+        return cfg_source
+    if isinstance(cfg_source, (bytes, bytearray)):
+        return compile_profile(load_config(cfg_source))
+    if isinstance(cfg_source, dict):
+        return compile_profile(cfg_source)
+    raise ValueError("cfg_source deve ser bytes (YAML), dict ou CompiledProfile.")
 
-def run_filter(df: pd.DataFrame, text_col: str, cfg_source: CfgSource) -> pd.DataFrame:
+def classify_texts(texts: Sequence[Any], profile: CompiledProfile, chunk_size: int = 10_000,
+                   mode: str = "full") -> Dict[str, Any]:
     """
-    Aplica o filtro básico a um DataFrame, retornando um novo DataFrame com colunas extras
-    e campos de auditoria em linguagem natural.
+    Núcleo de run_filter sem pandas: devolve {coluna: valores} (RESULT_COLUMNS), uma
+    posição por texto. As linhas são casadas em blocos de `chunk_size`; a proximidade ao
+    contexto de cada bloco é calculada de forma vetorizada sobre os matches em CSR.
+    mode="decision": só a coluna `decision` (ver `_classify_decisions`).
     """
-    if isinstance(cfg_source, (bytes, bytearray)):
-        cfg = load_config(cfg_source)
-    elif isinstance(cfg_source, dict):
-        cfg = cfg_source
-    else:
-        raise ValueError("cfg_source deve ser bytes (YAML) ou dict.")
-
-    norm_opts = cfg.get("normalization", {}) or {}
-    lowercase = bool(norm_opts.get("lowercase", True))
-    strip_acc = bool(norm_opts.get("strip_accents", True))
-    window = int(cfg.get("window", 8))
-
-    def _norm_terms(terms):
-        return [normalize_text(t, lowercase=lowercase, strip_accents=strip_acc) for t in (terms or [])]
-
-    pos_patterns = compile_terms(_norm_terms(cfg.get("positives")))
-    neg_patterns = compile_terms(_norm_terms(cfg.get("negatives")))
-    ctx_patterns = compile_terms(_norm_terms(cfg.get("contexts")))
-
-    out_rows = []
-    for _, row in df.iterrows():
-        text = row.get(text_col, "")
-        text = "" if text is None else str(text)
-        text_norm = normalize_text(text, lowercase=lowercase, strip_accents=strip_acc)
-        words_idx = _word_starts(text_norm)
-
-        pos_matches = find_matches(text_norm, pos_patterns)
-        neg_matches = find_matches(text_norm, neg_patterns)
-        ctx_matches = find_matches(text_norm, ctx_patterns)
-
-        P = len(pos_matches)
-        N = len(neg_matches)
-        Cpos = any_near(pos_matches, ctx_matches, window, words_idx) if ctx_patterns else False
-        Cneg = any_near(neg_matches, ctx_matches, window, words_idx) if ctx_patterns else False
-
-        decision, reason_code = decide_basic(P, N, Cpos, Cneg, cfg)
-        score = P - N
-
-        minP = int(cfg.get("min_pos_to_include", 1))
-        minN = int(cfg.get("min_neg_to_exclude", 1))
-        require_ctx = bool(cfg.get("require_context", False))
-        neg_wins = bool(cfg.get("negative_wins_ties", True))
-        # Tradução humana
-        reason_human, reason_human_detail = _reason_pt(
-            reason_code, P, N, minP, minN, Cpos, Cneg, window, require_ctx, neg_wins
-        )
-
-        new_row = dict(row)
-        new_row["decision"] = decision
+    if mode == "decision":
+        return _classify_decisions(texts, profile, chunk_size)
+    if mode != "full":
+        raise ValueError(f"mode inválido: {mode!r} (use um de {MODES}).")
+    cfg = profile.cfg
+    window = profile.window
+    pos_set, neg_set, ctx_set = profile.positives, profile.negatives, profile.contexts
+    chunk_size = max(1, int(chunk_size))
+
+    minP = int(cfg.get("min_pos_to_include", 1))
+    minN = int(cfg.get("min_neg_to_exclude", 1))
+    require_ctx = bool(cfg.get("require_context", False))
+    neg_wins = bool(cfg.get("negative_wins_ties", True))
+
+    # 1) matching por bloco (CSR) + proximidade vetorizada
+    n = len(texts)
+    P = np.zeros(n, dtype=np.int64)
+    N = np.zeros(n, dtype=np.int64)
+    Cpos = np.zeros(n, dtype=bool)
+    Cneg = np.zeros(n, dtype=bool)
+    ctx_count = np.zeros(n, dtype=np.int64)
+    pos_terms: List[str] = []
+    neg_terms: List[str] = []
+    ctx_terms: List[str] = []
+
+    for lo in range(0, n, chunk_size):
+        hi = min(n, lo + chunk_size)
+        with timed("engine.scan"):
+            pos, neg, ctx, _ = _scan_chunk(texts[lo:hi], profile)
+        P[lo:hi] = pos.counts()
+        N[lo:hi] = neg.counts()
+        ctx_count[lo:hi] = ctx.counts()
+        if len(ctx_set):
+            with timed("engine.proximity"):
+                Cpos[lo:hi] = near_rows(pos, ctx, window)
+                Cneg[lo:hi] = near_rows(neg, ctx, window)
+        for r in range(hi - lo):
+            pos_terms.append(_unique_terms(pos.row_term_ids(r), pos_set.terms))
+            neg_terms.append(_unique_terms(neg.row_term_ids(r), neg_set.terms))
+            ctx_terms.append(_unique_terms(ctx.row_term_ids(r), ctx_set.terms))
+
+    # 2) decisão vetorizada sobre a coluna inteira
+    with timed("engine.decide"):
+        decision, reason_code, score = decide_vectorized(P, N, Cpos, Cneg, cfg)
+
+    # 3) textos de auditoria
+    reason_tech: List[str] = []
+    reason_human: List[str] = []
+    reason_human_detail: List[str] = []
+    with timed("engine.audit"):
+        for p, q, cp, cn, code in zip(P.tolist(), N.tolist(), Cpos.tolist(), Cneg.tolist(), reason_code.tolist()):
+            reason_tech.append(
+                f"P={p} (min {minP}), N={q} (min {minN}), "
+                f"Cpos={'1' if cp else '0'}, Cneg={'1' if cn else '0'}, janela={window}, "
+                f"require_ctx={'1' if require_ctx else '0'}, "
+                f"neg_wins={'1' if neg_wins else '0'} → {code}"
+            )
+            short, detail = _reason_pt(code, p, q, minP, minN, cp, cn, window, require_ctx, neg_wins)
+            reason_human.append(short)
+            reason_human_detail.append(detail)
+    _metric_inc("engine.rows", n)
+
+    return {
+        "decision": decision.tolist(),
         # códigos técnicos (mantidos)
-        new_row["decision_reason_code"] = reason_code
-        new_row["decision_reason"] = (
-            f"P={P} (min {minP}), N={N} (min {minN}), "
-            f"Cpos={'1' if Cpos else '0'}, Cneg={'1' if Cneg else '0'}, janela={window}, "
-            f"require_ctx={'1' if require_ctx else '0'}, "
-            f"neg_wins={'1' if neg_wins else '0'} → {reason_code}"
-        )
+        "decision_reason_code": reason_code.tolist(),
+        "decision_reason": reason_tech,
         # linguagem natural
-        new_row["reason_human"] = reason_human
-        new_row["reason_human_detail"] = reason_human_detail
+        "reason_human": reason_human,
+        "reason_human_detail": reason_human_detail,
+        "p_count": P,
+        "n_count": N,
+        "ctx_count": ctx_count,
+        "near_pos_ctx": Cpos,
+        "near_neg_ctx": Cneg,
+        "score_total": score,
+        "pos_terms": pos_terms,
+        "neg_terms": neg_terms,
+        "ctx_terms": ctx_terms,
+    }
 
-        new_row["p_count"] = P
-        new_row["n_count"] = N
-        new_row["ctx_count"] = len(ctx_matches)
-        new_row["near_pos_ctx"] = bool(Cpos)
-        new_row["near_neg_ctx"] = bool(Cneg)
-        new_row["score_total"] = float(score)
+def _classify_decisions(texts: Sequence[Any], profile: CompiledProfile, chunk_size: int = 10_000) -> Dict[str, Any]:
+    """
+    Só a decisão, idêntica à do modo completo: sem colunas de auditoria nem listas de
+    termos, e cada linha para de ser varrida quando a decisão não pode mais mudar
+    (`decision_settler`). As demais seguem o caminho normal (proximidade + decisão).
+    """
+    cfg = profile.cfg
+    stop = decision_settler(profile)
+    chunk_size = max(1, int(chunk_size))
+    n = len(texts)
+    decision: List[str] = []
+    early = 0
+    for lo in range(0, n, chunk_size):
+        hi = min(n, lo + chunk_size)
+        with timed("engine.scan"):
+            pos, neg, ctx, settled = _scan_chunk(texts[lo:hi], profile, stop)
+        Cpos = Cneg = np.zeros(hi - lo, dtype=bool)
+        if len(profile.contexts):
+            with timed("engine.proximity"):
+                Cpos = near_rows(pos, ctx, profile.window)
+                Cneg = near_rows(neg, ctx, profile.window)
+        with timed("engine.decide"):
+            dec, _, _ = decide_vectorized(pos.counts(), neg.counts(), Cpos, Cneg, cfg)
+        for r, d in settled.items():
+            dec[r] = d
+        decision.extend(dec.tolist())
+        early += len(settled)
+    _metric_inc("engine.rows", n)
+    _metric_inc("engine.early_stops", early)
+    return {"decision": decision}
+
+# ---------- Modos de execução (dedup / processos) ----------
+def _take_columns(cols: Dict[str, Any], idx: np.ndarray) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, values in cols.items():
+        if isinstance(values, np.ndarray):
+            out[name] = values[idx]
+        else:
+            out[name] = [values[i] for i in idx.tolist()]
+    return out
 
-        new_row["pos_terms"] = _unique_terms(pos_matches)
-        new_row["neg_terms"] = _unique_terms(neg_matches)
-        new_row["ctx_terms"] = _unique_terms(ctx_matches)
+def _concat_columns(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, first in parts[0].items():
+        if isinstance(first, np.ndarray):
+            out[name] = np.concatenate([p[name] for p in parts])
+        else:
+            out[name] = [v for p in parts for v in p[name]]
+    return out
 
-        out_rows.append(new_row)
+def dedup_texts(texts: Sequence[Any]) -> Tuple[List[Any], np.ndarray]:
+    """
+    (textos únicos, inverso) com texts[i] ≡ únicos[inverso[i]]. A chave é a mesma
+    conversão para str que o scan faz (None -> ""), então o resultado é idêntico.
+    """
+    first: Dict[str, int] = {}
+    uniq: List[Any] = []
+    inverse = np.empty(len(texts), dtype=np.int64)
+    for i, t in enumerate(texts):
+        key = t if isinstance(t, str) else ("" if t is None else str(t))
+        j = first.get(key)
+        if j is None:
+            j = first[key] = len(uniq)
+            uniq.append(key)
+        inverse[i] = j
+    return uniq, inverse
+
+_WORKER_PROFILE: Optional[CompiledProfile] = None
+
+def _init_worker(profile: CompiledProfile) -> None:
+    # o perfil é enviado uma única vez por processo, não a cada bloco
+    global _WORKER_PROFILE
+    _WORKER_PROFILE = profile
+
+def _classify_in_worker(texts: Sequence[Any], chunk_size: int, mode: str) -> Dict[str, Any]:
+    return classify_texts(texts, _WORKER_PROFILE, chunk_size, mode)
+
+def _classify_parallel(texts: Sequence[Any], profile: CompiledProfile, chunk_size: int, workers: int,
+                       mode: str = "full", executor: str = "process") -> Dict[str, Any]:
+    """
+    Blocos de `chunk_size` num pool. "process": perfil enviado uma vez por processo;
+    "thread": perfil compartilhado, sem pickle nem spawn — o ganho vem dos trechos que
+    soltam o GIL (pré-filtro em `regex` com concurrent=True, numpy).
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    chunk_size = max(1, int(chunk_size))
+    blocks = [texts[lo:lo + chunk_size] for lo in range(0, len(texts), chunk_size)]
+    n = min(workers, len(blocks))
+    if executor == "thread":
+        profile.prefilter((0, 1) if mode == "decision" else (0, 1, 2))  # monta antes das threads
+        with ThreadPoolExecutor(max_workers=n, thread_name_prefix="engine") as ex:
+            parts = list(ex.map(lambda b: classify_texts(b, profile, chunk_size, mode), blocks))
+    else:
+        with ProcessPoolExecutor(max_workers=n, initializer=_init_worker, initargs=(profile,)) as ex:
+            parts = list(ex.map(_classify_in_worker, blocks, [chunk_size] * len(blocks), [mode] * len(blocks)))
+    return _concat_columns(parts)
 
-    return pd.DataFrame(out_rows)
+def classify(texts: Sequence[Any], cfg_source: CfgSource, chunk_size: int = 10_000,
+             dedup: bool = False, workers: int = 1, mode: str = "full",
+             executor: str = "process") -> Dict[str, Any]:
+    """
+    classify_texts com os modos de execução:
+      - dedup: textos repetidos são casados uma única vez e o resultado é replicado;
+      - workers > 1: blocos de `chunk_size` distribuídos num pool de processos
+        (executor="process") ou de threads (executor="thread");
+      - mode="decision": só a coluna `decision` (DECISION_COLUMNS), com parada antecipada.
+    O resultado é idêntico ao serial em qualquer combinação.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode inválido: {mode!r} (use um de {MODES}).")
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor inválido: {executor!r} (use um de {EXECUTORS}).")
+    with timed("engine.compile"):
+        profile = resolve_profile(cfg_source)
+    with timed("engine.classify"):
+        texts = list(texts)
+        inverse = None
+        if dedup:
+            texts, inverse = dedup_texts(texts)
+        if workers > 1 and len(texts) > chunk_size:
+            cols = _classify_parallel(texts, profile, chunk_size, workers, mode, executor)
+        else:
+            cols = classify_texts(texts, profile, chunk_size, mode)
+        if inverse is not None:
+            cols = _take_columns(cols, inverse)
+    return cols
+
+def run_filter(df: pd.DataFrame, text_col: str, cfg_source: CfgSource, chunk_size: int = 10_000,
+               dedup: bool = False, workers: int = 1, mode: str = "full",
+               executor: str = "process") -> pd.DataFrame:
+    """
+    Aplica o filtro básico a um DataFrame, retornando um novo DataFrame com colunas extras
+    e campos de auditoria em linguagem natural (ver `classify` para dedup/workers/executor).
+    mode="decision" acrescenta só a coluna `decision`.
+    """
+    profile = resolve_profile(cfg_source)
+    texts = df[text_col].tolist() if text_col in df.columns else [""] * len(df)
+    cols = classify(texts, profile, chunk_size=chunk_size, dedup=dedup, workers=workers, mode=mode,
+                    executor=executor)
+
+    out = df.reset_index(drop=True).copy()
+    for name in (DECISION_COLUMNS if mode == "decision" else RESULT_COLUMNS):
+        out[name] = cols[name]
+    return out
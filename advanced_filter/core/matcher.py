@@ -4,6 +4,9 @@ import regex as re
 
 Span = Tuple[int,int]
 
+# flags globais inline, ex.: "(?s)" — não podem ir para o meio de uma alternação
+_GLOBAL_INLINE_FLAGS = re.compile(r"\(\?[aBbeEfiLmprsuVwx0-9]+\)")
+
 def _compile(pattern: str, kind: str) -> re.Pattern:
     if kind == "literal":
         esc = re.escape(pattern)
@@ -17,18 +20,91 @@ def _compile(pattern: str, kind: str) -> re.Pattern:
         raise ValueError(f"Tipo de padrão inválido: {kind}")
 
 class PatternIndex:
+    """
+    Índice de padrões de uma classe (positivos, negativos ou um grupo de contexto).
+
+    Em vez de um finditer por spec, `findall` faz poucas varreduras combinadas:
+      - literais/frases: um único padrão com listas nomeadas (\\L<lit>, \\L<phr>);
+      - regex do usuário: uma alternação por conjunto de flags.
+    As varreduras combinadas (overlapped) só apontam posições candidatas; cada spec é
+    confirmada ali com o seu próprio padrão, preservando exatamente o resultado de rodar
+    `finditer` spec a spec (inclusive sobreposições entre specs diferentes).
+    """
     def __init__(self, specs: Iterable[dict]):
         self.specs = list(specs)
         self.compiled: List[Tuple[re.Pattern, dict]] = [
             (_compile(s["pattern"], s.get("type","literal")), s) for s in self.specs
         ]
 
+        # literais/frases: texto (casefold) -> índices das specs, agrupados por tamanho
+        lits: List[str] = []
+        phrs: List[str] = []
+        self._by_len: Dict[int, Dict[str, List[int]]] = {}
+        # regex: flags -> índices das specs
+        regex_groups: Dict[int, List[int]] = {}
+        self._standalone: List[int] = []
+
+        for i, (rx, s) in enumerate(self.compiled):
+            kind = s.get("type", "literal")
+            pattern = s["pattern"]
+            if kind in ("literal", "phrase") and pattern:
+                (lits if kind == "literal" else phrs).append(pattern)
+                bucket = self._by_len.setdefault(len(pattern), {})
+                bucket.setdefault(pattern.casefold(), []).append(i)
+            elif kind == "regex" and pattern and rx.groups == 0 and not _GLOBAL_INLINE_FLAGS.search(pattern):
+                regex_groups.setdefault(rx.flags, []).append(i)
+            else:
+                self._standalone.append(i)
+
+        # varreduras combinadas: (padrão candidato, specs a confirmar | None = literais/frases)
+        self._scans: List[Tuple[re.Pattern, object]] = []
+        alts, lists = [], {}
+        if lits:
+            alts.append(r"\b\L<lit>\b")
+            lists["lit"] = lits
+        if phrs:
+            alts.append(r"\L<phr>")
+            lists["phr"] = phrs
+        if alts:
+            self._scans.append((re.compile("|".join(alts), flags=re.IGNORECASE, **lists), None))
+        for flags, idxs in regex_groups.items():
+            if len(idxs) == 1:
+                self._standalone.append(idxs[0])
+                continue
+            alt = "|".join(f"(?:{self.specs[i]['pattern']})" for i in idxs)
+            self._scans.append((re.compile(alt, flags=flags), idxs))
+        self._standalone.sort()
+
+    def _literal_candidates(self, text: str, p: int) -> List[int]:
+        out: List[int] = []
+        for n, bucket in self._by_len.items():
+            idxs = bucket.get(text[p:p + n].casefold())
+            if idxs:
+                out.extend(idxs)
+        return out
+
     def findall(self, text: str) -> List[Tuple[Span, dict]]:
-        hits: List[Tuple[Span, dict]] = []
-        for rx, meta in self.compiled:
-            for m in rx.finditer(text):
-                hits.append(((m.start(), m.end()), meta))
-        return hits
+        found: List[Tuple[int, int, int]] = []  # (spec, start, end)
+        next_pos: Dict[int, int] = {}           # não-sobreposição por spec (semântica do finditer)
+
+        for scan, idxs in self._scans:
+            for cand in scan.finditer(text, overlapped=True):
+                p = cand.start()
+                for i in (idxs if idxs is not None else self._literal_candidates(text, p)):
+                    if p < next_pos.get(i, 0):
+                        continue
+                    m = self.compiled[i][0].match(text, p)
+                    if m is None:
+                        continue
+                    found.append((i, p, m.end()))
+                    next_pos[i] = m.end() if m.end() > p else p + 1
+
+        for i in self._standalone:
+            for m in self.compiled[i][0].finditer(text):
+                found.append((i, m.start(), m.end()))
+
+        found.sort()
+        return [((s, e), self.specs[i]) for i, s, e in found]
 
 def build_indices(config) -> Dict[str, PatternIndex]:
     idx = {}
@@ -1,7 +1,14 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+from array import array
+from bisect import bisect_right
+import re
 from unidecode import unidecode
 
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_END_RE = re.compile(r"[.!?]")
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*")
+
 def normalize(text: str, lowercase: bool = True, strip_accents: bool = True) -> str:
     if strip_accents:
         text = unidecode(text)
@@ -32,3 +39,74 @@ def sentences(text: str) -> List[Tuple[int,int]]:
     if start < len(text):
         spans.append((start, len(text)))
     return spans
+
+def _segment_starts(text: str, breaks: "re.Pattern[str]") -> List[int]:
+    if not text:
+        return []
+    starts = [0]
+    for m in breaks.finditer(text):
+        if m.end() < len(text):
+            starts.append(m.end())
+    return starts
+
+def sentence_starts(text: str) -> List[int]:
+    """Inícios (ordenados) das sentenças; mesmos cortes de `sentences`."""
+    return _segment_starts(text, _SENTENCE_END_RE)
+
+def paragraph_starts(text: str) -> List[int]:
+    """Inícios (ordenados) dos parágrafos: quebra de linha (ou linhas em branco) separa parágrafos."""
+    return _segment_starts(text, _PARAGRAPH_BREAK_RE)
+
+# ---------- Tokenização única por linha ----------
+class TokenizedText:
+    """
+    Texto (já normalizado) tokenizado UMA vez e compartilhado por matching, proximidade,
+    DSL (WITHIN) e realce. Tokens = sequências \\w+, com offsets em array('i');
+    limites de sentença/parágrafo calculados sob demanda e guardados.
+    """
+    __slots__ = ("text", "_starts", "_ends", "_sentences", "_paragraphs")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._starts: Optional[array] = None
+        self._ends: Optional[array] = None
+        self._sentences: Optional[List[int]] = None
+        self._paragraphs: Optional[List[int]] = None
+
+    def _tokenize(self) -> None:
+        starts, ends = array("i"), array("i")
+        for m in _WORD_RE.finditer(self.text):
+            starts.append(m.start())
+            ends.append(m.end())
+        self._starts, self._ends = starts, ends
+
+    @property
+    def starts(self) -> array:
+        if self._starts is None:
+            self._tokenize()
+        return self._starts
+
+    @property
+    def ends(self) -> array:
+        if self._ends is None:
+            self._tokenize()
+        return self._ends
+
+    @property
+    def sentence_starts(self) -> List[int]:
+        if self._sentences is None:
+            self._sentences = sentence_starts(self.text)
+        return self._sentences
+
+    @property
+    def paragraph_starts(self) -> List[int]:
+        if self._paragraphs is None:
+            self._paragraphs = paragraph_starts(self.text)
+        return self._paragraphs
+
+    def token_index(self, char_idx: int) -> int:
+        """Nº de tokens que começam em posição <= char_idx (mesma régua da janela do engine)."""
+        return bisect_right(self.starts, char_idx)
+
+    def __len__(self) -> int:
+        return len(self.starts)
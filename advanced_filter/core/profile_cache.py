@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de perfis compilados (CompiledProfile) em memória e em disco.
+
+Chave = hash do conteúdo do YAML (ou do dict canônico) + ENGINE_VERSION. Mudou o YAML ou
+a versão do engine → chave nova, e a entrada antiga simplesmente deixa de ser usada
+(e é removida pela poda). Os arquivos ficam ao lado dos perfis, em `<perfis>/.cache`,
+e só são lidos no 1º uso de cada perfil.
+
+Obs.: o cache é local e usa pickle — não aponte `base_dir` para um diretório compartilhado
+com terceiros.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional, Union
+from collections import OrderedDict
+import gc
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+
+try:
+    from .config_loader import load_config
+    from .engine import CompiledProfile, compile_profile, ENGINE_VERSION
+except Exception:
+    from config_loader import load_config
+    from engine import CompiledProfile, compile_profile, ENGINE_VERSION
+
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".filtro_avancado" / "perfis" / ".cache"
+_SUFFIX = ".pkl"
+
+def profile_key(cfg_source: Union[bytes, Dict[str, Any]]) -> str:
+    """Hash do conteúdo do perfil + versão do engine."""
+    if isinstance(cfg_source, (bytes, bytearray)):
+        payload = bytes(cfg_source)
+    elif isinstance(cfg_source, dict):
+        payload = json.dumps(cfg_source, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    else:
+        raise ValueError("cfg_source deve ser bytes (YAML) ou dict.")
+    return f"v{ENGINE_VERSION}-" + hashlib.sha256(payload).hexdigest()[:32]
+
+class ProfileCache:
+    """
+    Memória (LRU com `max_memory` perfis) + disco (`max_disk` arquivos, poda pelos mais
+    antigos). Falhas de leitura/escrita no disco não interrompem: o perfil é recompilado.
+    """
+
+    def __init__(self, base_dir: Optional[pathlib.Path] = DEFAULT_CACHE_DIR,
+                 max_memory: int = 8, max_disk: int = 64):
+        self.base_dir = pathlib.Path(base_dir) if base_dir is not None else None
+        self.max_memory = max(1, int(max_memory))
+        self.max_disk = max(1, int(max_disk))
+        self._mem: "OrderedDict[str, CompiledProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory": 0, "disk": 0, "compiled": 0}
+
+    # ---------- API ----------
+    def get(self, cfg_source: Union[bytes, Dict[str, Any]]) -> CompiledProfile:
+        """Perfil compilado para o YAML/dict, da memória, do disco ou compilando agora."""
+        key = profile_key(cfg_source)
+        with self._lock:
+            prof = self._mem.get(key)
+            if prof is not None:
+                self._mem.move_to_end(key)
+                self.stats["memory"] += 1
+                return prof
+
+        prof = self._load(key)
+        if prof is not None:
+            self.stats["disk"] += 1
+        else:
+            cfg = load_config(cfg_source) if isinstance(cfg_source, (bytes, bytearray)) else cfg_source
+            prof = compile_profile(cfg)
+            self.stats["compiled"] += 1
+            self._store(key, prof)
+
+        with self._lock:
+            self._mem[key] = prof
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_memory:
+                self._mem.popitem(last=False)
+        return prof
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._mem.clear()
+        if disk and self.base_dir is not None and self.base_dir.exists():
+            for p in self.base_dir.glob("*" + _SUFFIX):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    # ---------- Disco ----------
+    def _path(self, key: str) -> Optional[pathlib.Path]:
+        return self.base_dir / (key + _SUFFIX) if self.base_dir is not None else None
+
+    def _load(self, key: str) -> Optional[CompiledProfile]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        gc_was_enabled = gc.isenabled()
+        gc.disable()  # unpickle de tries grandes: mesmo motivo do TermIndex
+        try:
+            with open(path, "rb") as fh:
+                prof = pickle.load(fh)
+            os.utime(path)  # mantém os mais usados fora da poda
+            return prof if isinstance(prof, CompiledProfile) else None
+        except Exception:
+            return None  # arquivo corrompido/incompatível: recompila e sobrescreve
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _store(self, key: str, prof: CompiledProfile) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # escrita atômica: outro processo nunca lê um pickle pela metade
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    pickle.dump(prof, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)  # a poda só olha *.pkl: o .tmp ficaria para sempre
+                raise
+            self._prune()
+        except Exception:
+            pass
+
+    def _prune(self) -> None:
+        """Remove entradas de outras versões do engine e as mais antigas além de `max_disk`."""
+        prefix = f"v{ENGINE_VERSION}-"
+        files = []
+        for p in self.base_dir.glob("*" + _SUFFIX):
+            if not p.name.startswith(prefix):
+                p.unlink(missing_ok=True)
+            else:
+                files.append((p.stat().st_mtime, p))
+        files.sort()
+        for _, p in files[: max(0, len(files) - self.max_disk)]:
+            p.unlink(missing_ok=True)
+
+_default_cache: Optional[ProfileCache] = None
+
+def get_profile_cache() -> ProfileCache:
+    """Cache padrão do processo (em DEFAULT_CACHE_DIR), criado no 1º uso."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ProfileCache(DEFAULT_CACHE_DIR)
+    return _default_cache
+
+def get_compiled_profile(cfg_source: Union[bytes, Dict[str, Any]]) -> CompiledProfile:
+    return get_profile_cache().get(cfg_source)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Manifesto dos perfis salvos em disco (carregamento preguiçoso).
+
+Para cada `<perfis>/*.yaml` guarda (nome, caminho, mtime, tamanho, sha256). A atualização
+é incremental: um `stat` por arquivo e só os que mudaram de mtime/tamanho são relidos e
+re-hasheados. O manifesto é persistido em `<perfis>/.manifest.json`, então um reinício do
+servidor também não relê a pasta inteira.
+
+O YAML só é parseado quando o perfil é pedido (`load`), e o resultado fica num cache do
+processo indexado pelo hash do conteúdo — compartilhado por todas as sessões. O perfil
+compilado vem do `profile_cache`, pela mesma chave de conteúdo.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import re
+import tempfile
+import threading
+import time
+
+import yaml
+
+try:
+    from .config_loader import load_config
+except Exception:
+    from config_loader import load_config
+
+MANIFEST_FILE = ".manifest.json"
+_MANIFEST_VERSION = 2  # 2: nome lido também de perfis com BOM
+_NAME_LINE = re.compile(rb"^name:[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+_BOM = b"\xef\xbb\xbf"
+
+def _peek_name(data: bytes) -> Optional[str]:
+    """Lê só a linha `name:` de nível superior (evita parsear o YAML inteiro)."""
+    if data.startswith(_BOM):  # perfis salvos no Windows; o yaml.safe_load do load() já ignora
+        data = data[len(_BOM):]
+    m = _NAME_LINE.search(data)
+    if not m or not m.group(1):
+        return None
+    try:
+        value = yaml.safe_load(m.group(1).decode("utf-8"))
+    except Exception:
+        return None
+    name = str(value).strip() if value is not None else ""
+    return name or None
+
+class ProfileManifest:
+    """
+    Índice dos perfis de `base_dir`. `refresh()` é barato e limitado a uma varredura a
+    cada `refresh_interval` segundos; `load(name)` devolve uma cópia do perfil parseado.
+    """
+
+    def __init__(self, base_dir: pathlib.Path, refresh_interval: float = 2.0, max_parsed: int = 128):
+        self.base_dir = pathlib.Path(base_dir)
+        self.refresh_interval = max(0.0, float(refresh_interval))
+        self.max_parsed = max(1, int(max_parsed))
+        self._entries: Dict[str, Dict[str, Any]] = {}   # caminho -> entrada
+        self._by_name: Dict[str, Dict[str, Any]] = {}   # nome -> entrada
+        self._parsed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # sha256 -> perfil
+        self._lock = threading.RLock()
+        self._last_scan = 0.0
+        self._read_manifest()
+
+    # ---------- Manifesto ----------
+    def refresh(self, force: bool = False) -> None:
+        """Atualiza as entradas cujo mtime/tamanho mudou; remove as de arquivos apagados."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_scan and now - self._last_scan < self.refresh_interval:
+                return
+            self._last_scan = now
+
+            seen = set()
+            changed = False
+            try:
+                it = os.scandir(self.base_dir)
+            except OSError:
+                it = None
+            if it is not None:
+                with it:
+                    for de in it:
+                        if not de.name.endswith(".yaml") or not de.is_file():
+                            continue
+                        try:
+                            st = de.stat()
+                        except OSError:
+                            continue
+                        seen.add(de.path)
+                        old = self._entries.get(de.path)
+                        if old and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+                            continue
+                        entry = self._scan_file(de.path, st)
+                        if entry is not None:
+                            self._entries[de.path] = entry
+                            changed = True
+            for path in [p for p in self._entries if p not in seen]:
+                del self._entries[path]
+                changed = True
+
+            if changed:
+                self._reindex()
+                self._write_manifest()
+
+    def names(self) -> List[str]:
+        self.refresh()
+        with self._lock:
+            return list(self._by_name.keys())
+
+    def entry(self, name: str) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        with self._lock:
+            e = self._by_name.get(name)
+            return dict(e) if e else None
+
+    def __contains__(self, name: object) -> bool:
+        self.refresh()
+        with self._lock:
+            return name in self._by_name
+
+    def __len__(self) -> int:
+        self.refresh()
+        with self._lock:
+            return len(self._by_name)
+
+    # ---------- Perfis ----------
+    def read_bytes(self, name: str) -> bytes:
+        """Bytes atuais do YAML do perfil (atualiza a entrada se o arquivo mudou)."""
+        e = self.entry(name)
+        if e is None:
+            raise KeyError(name)
+        data = pathlib.Path(e["path"]).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != e["sha256"]:
+            self.refresh(force=True)
+        return data
+
+    def load(self, name: str) -> Dict[str, Any]:
+        """Perfil normalizado (cópia própria: a sessão pode editá-lo à vontade)."""
+        data = self.read_bytes(name)
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            prof = self._parsed.get(key)
+            if prof is not None:
+                self._parsed.move_to_end(key)
+        if prof is None:
+            prof = load_config(data)
+            with self._lock:
+                self._parsed[key] = prof
+                while len(self._parsed) > self.max_parsed:
+                    self._parsed.popitem(last=False)
+        out = copy.deepcopy(prof)
+        out["name"] = name
+        return out
+
+    def compiled(self, name: str):
+        """CompiledProfile do perfil, compartilhado via `profile_cache`."""
+        try:
+            from .profile_cache import get_compiled_profile
+        except Exception:
+            from profile_cache import get_compiled_profile
+        return get_compiled_profile(self.read_bytes(name))
+
+    # ---------- Interno ----------
+    def _scan_file(self, path: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        try:
+            data = pathlib.Path(path).read_bytes()
+        except OSError:
+            return None
+        return {
+            "name": _peek_name(data) or pathlib.Path(path).stem,
+            "path": path,
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+
+    def _reindex(self) -> None:
+        # Nomes repetidos: vale o 1º arquivo em ordem alfabética de caminho
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(self._entries):
+            e = self._entries[path]
+            by_name.setdefault(e["name"], e)
+        self._by_name = by_name
+
+    def _manifest_path(self) -> pathlib.Path:
+        return self.base_dir / MANIFEST_FILE
+
+    def _read_manifest(self) -> None:
+        try:
+            raw = json.loads(self._manifest_path().read_text(encoding="utf-8"))
+            if raw.get("version") != _MANIFEST_VERSION:
+                return
+            self._entries = {e["path"]: e for e in raw.get("entries", [])}
+            self._reindex()
+        except Exception:
+            self._entries = {}  # ausente/corrompido: a 1ª varredura reconstrói
+
+    def _write_manifest(self) -> None:
+        try:
+            payload = json.dumps(
+                {"version": _MANIFEST_VERSION, "entries": [self._entries[p] for p in sorted(self._entries)]},
+                ensure_ascii=False, indent=1,
+            )
+            fd, tmp = tempfile.mkstemp(dir=str(self.base_dir), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+            os.replace(tmp, self._manifest_path())
+        except Exception:
+            pass  # pasta só-leitura: o manifesto continua valendo em memória
+
+_manifests: Dict[str, ProfileManifest] = {}
+_manifests_lock = threading.Lock()
+
+def get_profile_manifest(base_dir: pathlib.Path) -> ProfileManifest:
+    """Manifesto do processo para `base_dir` (compartilhado por todas as sessões)."""
+    key = os.path.abspath(str(base_dir))
+    with _manifests_lock:
+        m = _manifests.get(key)
+        if m is None:
+            m = _manifests[key] = ProfileManifest(pathlib.Path(key))
+        return m
@@ -1,36 +1,83 @@
 from __future__ import annotations
-from typing import List, Tuple
-from .preprocessor import tokens_with_offsets, sentences
+from typing import List, Tuple, Optional, Sequence
+from bisect import bisect_right
+from .preprocessor import TokenizedText, sentence_starts, paragraph_starts
 
 Span = Tuple[int,int]
+TokenBounds = Tuple[Sequence[int], Sequence[int]]
 
-def within_tokens(text: str, spans_a: List[Span], spans_b: List[Span], n: int) -> bool:
-    toks = tokens_with_offsets(text)
-    def span_to_token_index(span: Span):
-        s, e = span
-        for i, (_, ts, te) in enumerate(toks):
-            if ts <= s < te or ts < e <= te or (s <= ts and te <= e):
-                return i
-        dists = [(i, min(abs(ts - s), abs(te - e))) for i,(_,ts,te) in enumerate(toks)]
-        return min(dists, key=lambda x:x[1])[0] if dists else 0
-
-    idx_a = [span_to_token_index(s) for s in spans_a]
-    idx_b = [span_to_token_index(s) for s in spans_b]
-    for ia in idx_a:
-        for ib in idx_b:
-            if abs(ia - ib) <= n:
-                return True
-    return False
+def span_to_token_index(span: Span, starts: Sequence[int], ends: Sequence[int]) -> int:
+    """
+    Índice do 1º token que sobrepõe o span; sem sobreposição, o token mais próximo
+    (menor min(|ts-s|, |te-e|), empate -> menor índice). O(log T) via bisect.
+    """
+    if not starts:
+        return 0
+    s, e = span
+    i = bisect_right(ends, s)  # 1º token com fim > s
+    if i < len(starts) and starts[i] < max(e, s + 1):
+        return i
+    # span cai no vão entre os tokens i-1 e i
+    best, best_d = -1, None
+    for j in (i - 1, i):
+        if 0 <= j < len(starts):
+            d = min(abs(starts[j] - s), abs(ends[j] - e))
+            if best_d is None or d < best_d:
+                best, best_d = j, d
+    return best
 
-def within_sentence(text: str, spans_a: List[Span], spans_b: List[Span]) -> bool:
-    sent_spans = sentences(text)
-    def in_same_sentence(sa: Span, sb: Span):
-        for ss,se in sent_spans:
-            if (ss <= sa[0] < se) and (ss <= sb[0] < se):
-                return True
+def any_within(idx_a: List[int], idx_b: List[int], n: int) -> bool:
+    """Existe par (a, b) com |a-b| <= n? Merge linear sobre os índices ordenados."""
+    if not idx_a or not idx_b:
         return False
-    for sa in spans_a:
-        for sb in spans_b:
-            if in_same_sentence(sa, sb):
-                return True
+    a = sorted(idx_a)
+    b = sorted(idx_b)
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if abs(a[i] - b[j]) <= n:
+            return True
+        if a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
     return False
+
+def within_tokens(text: str, spans_a: List[Span], spans_b: List[Span], n: int,
+                  bounds: Optional[TokenBounds] = None) -> bool:
+    if not spans_a or not spans_b:
+        return False
+    if bounds is None:
+        tt = TokenizedText(text)
+        bounds = (tt.starts, tt.ends)
+    starts, ends = bounds
+    idx_a = [span_to_token_index(s, starts, ends) for s in spans_a]
+    idx_b = [span_to_token_index(s, starts, ends) for s in spans_b]
+    return any_within(idx_a, idx_b, n)
+
+def segment_id(pos: int, starts: List[int], text_len: int) -> int:
+    """Índice do segmento (sentença/parágrafo) que contém `pos`, ou -1 se fora do texto."""
+    if pos < 0 or pos >= text_len or not starts:
+        return -1
+    return bisect_right(starts, pos) - 1
+
+def within_segment(spans_a: List[Span], spans_b: List[Span], starts: List[int], text_len: int) -> bool:
+    """Algum span de A começa no mesmo segmento que algum span de B?"""
+    if not spans_a or not spans_b:
+        return False
+    seg_a = {segment_id(s, starts, text_len) for s, _ in spans_a}
+    seg_a.discard(-1)
+    if not seg_a:
+        return False
+    return any(segment_id(s, starts, text_len) in seg_a for s, _ in spans_b)
+
+def within_sentence(text: str, spans_a: List[Span], spans_b: List[Span],
+                    starts: Optional[List[int]] = None) -> bool:
+    if starts is None:
+        starts = sentence_starts(text)
+    return within_segment(spans_a, spans_b, starts, len(text))
+
+def within_paragraph(text: str, spans_a: List[Span], spans_b: List[Span],
+                     starts: Optional[List[int]] = None) -> bool:
+    if starts is None:
+        starts = paragraph_starts(text)
+    return within_segment(spans_a, spans_b, starts, len(text))
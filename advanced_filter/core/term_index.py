@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de termos compartilhado pelas classes do perfil (positivos, negativos, contextos).
+
+Sintaxe de termo (já normalizado):
+  motor              palavra isolada            -> \\bmotor\\b
+  falha no motor     frase (contém espaço)      -> substring
+  rolament*          prefixo                    -> \\brolament\\w*
+  rol*mento          '*' em outra posição       -> \\w* naquele ponto (regex próprio)
+
+Palavras (inclusive com hífen/ponto no meio, ex.: "nr-12") e prefixos entram numa trie
+única: uma passada pelos tokens da linha (TokenizedText) acha os termos de todas as
+classes de uma vez. Frases entram num índice ancorado no 1º espaço (ver PhraseIndex).
+Nos dois casos o custo por linha não cresce com o nº de termos, o que permite perfis
+com 100k+ termos gerados automaticamente. Só os casos irregulares (coringa no meio,
+termo começando/terminando fora de \w) ficam com um regex por termo.
+CandidateFilter descarta de antemão as linhas que não podem casar nenhum termo.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Iterable
+from array import array
+from bisect import bisect_right
+import gc
+import re
+
+try:
+    from .preprocessor import TokenizedText
+except Exception:
+    from preprocessor import TokenizedText
+
+_WORD_RE = re.compile(r"\w+")
+_END = None  # chave do payload [(classe, term_id), ...] num nó da trie
+
+# ---------- Sintaxe ----------
+def _is_word_char(ch: str) -> bool:
+    # mesma definição de \w do módulo re para str
+    return ch.isalnum() or ch == "_"
+
+def _has_wildcard(t: str) -> bool:
+    return "*" in t and bool(t.replace("*", "").strip())
+
+def term_pattern(term: str) -> "re.Pattern[str]":
+    """Regex equivalente a um termo (usado para frases e casos fora da trie)."""
+    t = term.strip()
+    if not t:
+        return re.compile(r"$^")
+    if _has_wildcard(t):
+        body = r"\w*".join(re.escape(p) for p in t.split("*"))
+        if " " in t:
+            return re.compile(body)                    # frase com coringa = substring
+        tail = "" if t.endswith("*") else r"\b"
+        return re.compile(r"\b" + body + tail)
+    if " " in t:
+        return re.compile(re.escape(t))                # frase = substring
+    return re.compile(r"\b" + re.escape(t) + r"\b")    # palavra isolada
+
+# ---------- Plurais (PT-BR, opcional) ----------
+_PLURALS = (  # sufixo do singular -> sufixos do plural
+    ("ão", ("ões", "ães", "ãos")), ("ao", ("oes", "aes", "aos")),
+    ("al", ("ais",)), ("el", ("eis",)), ("ol", ("ois",)), ("ul", ("uis",)), ("il", ("is",)),
+    ("m", ("ns",)), ("r", ("res",)), ("z", ("zes",)),
+)
+_SINGULARS = (  # sufixo do plural -> sufixo do singular
+    ("ões", "ão"), ("ães", "ão"), ("ãos", "ão"), ("oes", "ao"), ("aes", "ao"), ("aos", "ao"),
+    ("ais", "al"), ("eis", "el"), ("ois", "ol"), ("uis", "ul"),
+    ("ns", "m"), ("res", "r"), ("zes", "z"),
+)
+_VOWELS = set("aeiouáéíóúâêôãõ")
+
+def pt_word_variants(word: str) -> List[str]:
+    """Formas singular/plural regulares de uma palavra em português (sem a própria palavra)."""
+    if len(word) < 3 or not word.isalpha():
+        return []
+    upper = word.isupper()
+    w = word.lower()
+    out: List[str] = []
+    for suf, plurals in _PLURALS:
+        if w.endswith(suf):
+            out += [w[: -len(suf)] + p for p in plurals]
+            break
+    else:
+        if w[-1] in _VOWELS:
+            out.append(w + "s")
+    if w.endswith("s"):
+        for suf, sing in _SINGULARS:
+            if w.endswith(suf):
+                out.append(w[: -len(suf)] + sing)
+                break
+        else:
+            if w[-2] in _VOWELS:
+                out.append(w[:-1])
+    seen, res = {w}, []
+    for v in out:
+        if v not in seen and len(v) >= 2:
+            seen.add(v)
+            res.append(v.upper() if upper else v)
+    return res
+
+def expand_plurals(terms: Sequence[str]) -> List[str]:
+    """
+    Acrescenta ao fim da lista as variantes singular/plural de cada termo (palavra ou
+    última palavra de uma frase). Variantes já presentes não são repetidas; em frases
+    (substring), variantes que só estendem/encurtam o termo original são descartadas
+    porque já casariam junto com ele (contariam em dobro).
+    """
+    out = list(terms)
+    present = set(terms)
+    for t in terms:
+        if not t or "*" in t:
+            continue
+        head, sep, last = t.rpartition(" ")
+        for v in pt_word_variants(last):
+            cand = head + sep + v
+            if sep and (cand.startswith(t) or t.startswith(cand)):
+                continue
+            if cand not in present:
+                present.add(cand)
+                out.append(cand)
+    return out
+
+# ---------- Índice ----------
+_PHRASE_KEY_TAIL = 4  # nº de caracteres após o 1º espaço usados na chave do PhraseIndex
+
+class PhraseIndex:
+    """
+    Frases (substring, com espaço) indexadas pelo 1º espaço: toda ocorrência de uma frase
+    "cabeca resto" tem o seu 1º espaço sobre um espaço do texto. Para cada espaço q da linha
+    e cada formato (len(cabeca), nº de chars após o espaço) existente, uma busca em dict
+    pela chave text[q-len(cabeca) : q+1+k] devolve as poucas frases candidatas, confirmadas
+    com startswith. O custo depende do nº de formatos distintos, não do nº de frases.
+    """
+
+    def __init__(self):
+        # (len_cabeca, len_chave) -> chave -> [(classe, term_id, frase)]
+        self._buckets: Dict[Tuple[int, int], Dict[str, List[Tuple[int, int, str]]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._buckets)
+
+    def add(self, c: int, tid: int, phrase: str) -> None:
+        head = phrase.index(" ")
+        klen = min(len(phrase), head + 1 + _PHRASE_KEY_TAIL)
+        bucket = self._buckets.setdefault((head, klen), {})
+        bucket.setdefault(phrase[:klen], []).append((c, tid, phrase))
+
+    def match(self, text: str, hits: List[List[Tuple[int, int, int]]]) -> None:
+        spaces = [i for i, ch in enumerate(text) if ch == " "] if " " in text else []
+        if not spaces:
+            return
+        found: List[Tuple[int, int, int, int]] = []  # (start, classe, term_id, end)
+        n = len(text)
+        for (head, klen), bucket in self._buckets.items():
+            for q in spaces:
+                s = q - head
+                if s < 0 or s + klen > n:
+                    continue
+                cands = bucket.get(text[s:s + klen])
+                if cands:
+                    for c, tid, phrase in cands:
+                        if text.startswith(phrase, s):
+                            found.append((s, c, tid, s + len(phrase)))
+        # mesma semântica do finditer por termo: ocorrências da mesma frase não se sobrepõem
+        found.sort()
+        last_end: Dict[Tuple[int, int], int] = {}
+        for s, c, tid, e in found:
+            if s < last_end.get((c, tid), -1):
+                continue
+            last_end[(c, tid)] = e
+            hits[c].append((s, tid, e))
+
+class TermIndex:
+    """
+    Trie compartilhada por todas as classes:
+      - `_tokens`: trie por token; arestas após o 1º token são (separador, token), o que
+        reproduz exatamente \\b...\\b para termos que começam e terminam em \\w;
+      - `_prefixes`: trie por caractere para termos "prefixo*";
+      - `_phrases`: frases (substring), ver PhraseIndex;
+      - `_regex`: (classe, term_id, padrão) para frases e termos irregulares.
+    """
+
+    def __init__(self, classes: Sequence[Sequence[str]]):
+        self.n_classes = len(classes)
+        self._tokens: Dict = {}
+        self._prefixes: Dict = {}
+        self._phrases = PhraseIndex()
+        self._regex: List[Tuple[int, int, "re.Pattern[str]"]] = []
+        # construção em massa (100k+ termos): o GC cíclico só atrasaria, nada aqui é lixo
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for c, terms in enumerate(classes):
+                for tid, t in enumerate(terms):
+                    self._add(c, tid, t)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _add(self, c: int, tid: int, t: str) -> None:
+        if not t:
+            return                                     # termo vazio nunca casa
+        if _WORD_RE.fullmatch(t):                      # caso mais comum: um único token
+            node = self._tokens.get(t)
+            if node is None:
+                node = self._tokens[t] = {}
+            node.setdefault(_END, []).append((c, tid))
+            return
+        if " " in t:
+            if _has_wildcard(t):
+                self._regex.append((c, tid, term_pattern(t)))
+            else:
+                self._phrases.add(c, tid, t)
+            return
+        if _has_wildcard(t):
+            body = t[:-1]
+            if t.endswith("*") and "*" not in body and _WORD_RE.fullmatch(body):
+                node = self._prefixes
+                for ch in body:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_END, []).append((c, tid))
+            else:
+                self._regex.append((c, tid, term_pattern(t)))
+            return
+        if not (_is_word_char(t[0]) and _is_word_char(t[-1])):
+            self._regex.append((c, tid, term_pattern(t)))
+            return
+        toks = _WORD_RE.findall(t)
+        gaps = _WORD_RE.split(t)[1:-1]
+        node = self._tokens.setdefault(toks[0], {})
+        for gap, tok in zip(gaps, toks[1:]):
+            node = node.setdefault((gap, tok), {})
+        node.setdefault(_END, []).append((c, tid))
+
+    def match(self, tt: TokenizedText) -> List[List[Tuple[int, int, int]]]:
+        """Hits por classe como listas (start, term_id, end), ordenadas por (start, term_id)."""
+        return self._scan(tt, None)[0]
+
+    def match_until(self, tt: TokenizedText,
+                    stop: Callable[[List[List[Tuple[int, int, int]]]], Any]) -> Tuple[List[List[Tuple[int, int, int]]], Any]:
+        """
+        Como `match`, mas chama `stop(hits)` a cada termo encontrado e interrompe a linha no
+        1º valor verdadeiro, devolvido junto (hits parciais, fora de ordem). Sem parada, o
+        2º item é None e os hits são os mesmos de `match`.
+        """
+        return self._scan(tt, stop)
+
+    def _scan(self, tt: TokenizedText, stop) -> Tuple[List[List[Tuple[int, int, int]]], Any]:
+        text = tt.text
+        hits: List[List[Tuple[int, int, int]]] = [[] for _ in range(self.n_classes)]
+        if stop is not None:
+            done = stop(hits)
+            if done:
+                return hits, done
+        if self._tokens or self._prefixes:
+            starts, ends = tt.starts, tt.ends
+            n = len(starts)
+            tok_root, pre_root = self._tokens, self._prefixes
+            last_end: Dict[Tuple[int, int], int] = {}  # não-sobreposição p/ termos multi-token
+            for i in range(n):
+                s, e = starts[i], ends[i]
+                tok = text[s:e]
+                node = tok_root.get(tok)
+                j = i
+                while node is not None:
+                    payload = node.get(_END)
+                    if payload:
+                        end = ends[j]
+                        for c, tid in payload:
+                            if j > i:
+                                if s < last_end.get((c, tid), -1):
+                                    continue
+                                last_end[(c, tid)] = end
+                            hits[c].append((s, tid, end))
+                        if stop is not None:
+                            done = stop(hits)
+                            if done:
+                                return hits, done
+                    j += 1
+                    if j >= n or len(node) == (1 if payload else 0):
+                        break
+                    node = node.get((text[ends[j - 1]:starts[j]], text[starts[j]:ends[j]]))
+                if pre_root:
+                    node = pre_root
+                    for ch in tok:
+                        node = node.get(ch)
+                        if node is None:
+                            break
+                        payload = node.get(_END)
+                        if payload:
+                            for c, tid in payload:
+                                hits[c].append((s, tid, e))
+                            if stop is not None:
+                                done = stop(hits)
+                                if done:
+                                    return hits, done
+        if self._phrases:
+            self._phrases.match(text, hits)
+            if stop is not None:
+                done = stop(hits)
+                if done:
+                    return hits, done
+        for c, tid, rx in self._regex:
+            h = hits[c]
+            for m in rx.finditer(text):
+                h.append((m.start(), tid, m.end()))
+            if stop is not None:
+                done = stop(hits)
+                if done:
+                    return hits, done
+        for h in hits:
+            h.sort()
+        return hits, None
+
+    def candidate_filter(self, classes: Sequence[int]) -> "CandidateFilter":
+        """Pré-filtro das linhas que podem ter algum termo das `classes` (ver CandidateFilter)."""
+        return CandidateFilter(self, classes)
+
+# ---------- Pré-filtro de linhas candidatas ----------
+_MIN_INNER_KEY = 4  # token interno curto ("de", "no") aprova quase toda linha: usa o literal
+_MAX_PATTERN_KEYS = 2_000  # acima disso o regex combinado custa mais (compilar e buscar) que o matching
+def _trie_regex(node: Dict, classes: Sequence[int]) -> Optional[str]:
+    """Regex (alternância fatorada por prefixo) que casa o início de qualquer chave da trie."""
+    payload = node.get(_END)
+    if payload and any(c in classes for c, _ in payload):
+        return ""  # já basta até aqui (prefixo/literal completo)
+    alts = []
+    for ch, child in sorted((k, v) for k, v in node.items() if k is not _END):
+        sub = _trie_regex(child, classes)
+        if sub is not None:
+            alts.append(re.escape(ch) + sub)
+    if not alts:
+        return None
+    return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+def _has_class(node: Dict, classes: Sequence[int]) -> bool:
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        for k, v in n.items():
+            if k is _END:
+                if any(c in classes for c, _ in v):
+                    return True
+            else:
+                stack.append(v)
+    return False
+
+def _count_keys(node: Dict, classes: Sequence[int]) -> int:
+    """Nº de termos das `classes` guardados na trie."""
+    n, stack = 0, [node]
+    while stack:
+        for k, v in stack.pop().items():
+            if k is _END:
+                n += sum(1 for c, _ in v if c in classes)
+            else:
+                stack.append(v)
+    return n
+
+class CandidateFilter:
+    """
+    Teste barato de "esta linha pode ter algum termo?", sem falso negativo:
+      - palavras/termos multi-token: o 1º token do termo aparece entre os tokens da linha
+        (interseção de conjuntos, em C);
+      - frases com um token interno (cercado por não-\w dentro da frase) de 4+ letras:
+        esse token aparece inteiro na linha; as demais frases, prefixos e termos
+        irregulares vão para um único regex combinado (prefixos e literais em trie).
+    Linhas reprovadas não têm matches na classe pedida e pulam tokenização e matching.
+    Com mais de _MAX_PATTERN_KEYS entradas no regex combinado o filtro fica desligado
+    (`passthrough`: toda linha é candidata).
+    """
+
+    def __init__(self, index: TermIndex, classes: Sequence[int]):
+        classes = tuple(classes)
+        if set(classes) >= set(range(index.n_classes)):
+            self.keys = set(index._tokens)  # todo nó da trie leva a algum termo
+        else:
+            self.keys = {tok for tok, node in index._tokens.items() if _has_class(node, classes)}
+        self.passthrough = False
+        self.pattern = self.block_pattern = None
+        literals: Dict = {}
+        n_keys = 0
+        rest: List[str] = []
+        for bucket in index._phrases._buckets.values():
+            for cands in bucket.values():
+                for c, _, phrase in cands:
+                    if c not in classes:
+                        continue
+                    toks = _WORD_RE.findall(phrase)
+                    inner = toks[_is_word_char(phrase[0]):len(toks) - _is_word_char(phrase[-1])]
+                    key = max(inner, key=len) if inner else ""
+                    if len(key) >= _MIN_INNER_KEY:
+                        self.keys.add(key)
+                    else:
+                        node = literals
+                        for ch in phrase:
+                            node = node.setdefault(ch, {})
+                        node.setdefault(_END, []).append((c, 0))
+                        n_keys += 1
+        irregular = [rx.pattern for c, _, rx in index._regex if c in classes]
+        n_keys += len(irregular) + _count_keys(index._prefixes, classes)
+        if n_keys > _MAX_PATTERN_KEYS:
+            self.passthrough = True
+            self.keys = set()
+            return
+        lit = _trie_regex(literals, classes) if literals else None
+        if lit is not None:
+            rest.append(lit)
+        pre = _trie_regex(index._prefixes, classes) if index._prefixes else None
+        if pre is not None:
+            rest.append(r"\b" + pre)
+        rest += irregular
+        self.pattern = re.compile("|".join(f"(?:{r})" for r in rest)) if rest else None
+        self.block_pattern = _concurrent_pattern(self.pattern.pattern) if rest else None
+
+    def mask(self, texts: Sequence[str]) -> List[bool]:
+        """Para cada texto normalizado: True se ainda pode casar (vai ao matching completo)."""
+        if self.passthrough:
+            return [True] * len(texts)
+        keys, findall = self.keys, _WORD_RE.findall
+        out = [bool(keys) and not keys.isdisjoint(findall(t)) for t in texts]
+        if self.pattern is None:
+            return out
+        rest = [i for i, ok in enumerate(out) if not ok]
+        if not rest:
+            return out
+        joined = "\x00".join(texts[i] for i in rest)
+        if self.block_pattern is not None and joined.isascii():
+            # uma busca por linha candidata sobre o bloco inteiro, sem o GIL; em ASCII
+            # \w e \b do `regex` coincidem com os do `re`. Nenhum termo casa "\x00", então
+            # um match nunca atravessa linhas.
+            starts, pos = [], 0
+            for i in rest:
+                starts.append(pos)
+                pos += len(texts[i]) + 1
+            pos = 0
+            while True:
+                m = self.block_pattern.search(joined, pos, concurrent=True)
+                if m is None:
+                    break
+                k = bisect_right(starts, m.start()) - 1
+                out[rest[k]] = True
+                if k + 1 >= len(starts):
+                    break
+                pos = starts[k + 1]
+        else:
+            for i in rest:
+                out[i] = self.pattern.search(texts[i]) is not None
+        return out
+
+def _concurrent_pattern(pattern: str):
+    """Mesmo padrão no módulo `regex` (solta o GIL com concurrent=True); None se indisponível."""
+    if "\x00" in pattern:
+        return None
+    try:
+        import regex
+        return regex.compile(pattern)
+    except Exception:
+        return None
+
+def hits_to_arrays(hits: Iterable[Tuple[int, int, int]]) -> Tuple[array, array, array]:
+    starts, ends, tids = array("i"), array("i"), array("i")
+    for s, tid, e in hits:
+        starts.append(s)
+        ends.append(e)
+        tids.append(tid)
+    return starts, ends, tids
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Execução em pipeline: leitura, filtro e escrita sobrepostas.
+
+  leitor (thread) --[fila limitada]--> engine (1+ threads) --[fila limitada]--> escritor (thread)
+
+O leitor entrega blocos de `chunk_rows` linhas (CSV via read_csv(chunksize), Excel via
+openpyxl em modo read_only), o engine roda run_filter em cada bloco e o escritor grava em
+streaming (CSV em append; xlsx com xlsxwriter em constant_memory), na ordem original.
+As filas têm `queue_depth` posições: quando o estágio seguinte atrasa, o anterior
+bloqueia (backpressure), então a memória fica limitada a poucos blocos em voo e o tempo
+total tende ao do estágio mais lento, não à soma dos três. Um semáforo limita os blocos
+lidos e ainda não gravados a `queue_depth + engine_threads` — inclusive os que esperam
+no escritor por um bloco anterior mais lento.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import datetime as _dt
+import math
+import pathlib
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from advanced_filter.core.engine import CfgSource, resolve_profile, run_filter
+
+_EXCEL_EXTS = (".xlsx", ".xlsm")
+_SPLIT_SHEETS = (("INCLUI", "Incluidos"), ("REVISA", "Revisar"), ("EXCLUI", "Excluidos_do_Filtro"))
+FORMATS = ("xlsx", "split", "csv")
+
+# ---------- Leitura em blocos ----------
+def _header_names(raw: Tuple[Any, ...]) -> List[str]:
+    """Cabeçalho como o pandas monta: vazio -> "Unnamed: i", repetido -> "nome.1"."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for i, h in enumerate(raw):
+        name = f"Unnamed: {i}" if h is None or h == "" else str(h)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+def _iter_excel_chunks(path: str, sheet: Optional[str], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        names = _header_names(header)
+        width = len(names)
+        buf: List[Tuple[Any, ...]] = []
+        blanks = 0  # linhas vazias só entram se vier dado depois (read_excel descarta as finais)
+        for row in rows:
+            if all(v is None for v in row):
+                blanks += 1
+                continue
+            buf.extend([(None,) * width] * blanks)
+            blanks = 0
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf[:chunk_rows], columns=names)
+                buf = buf[chunk_rows:]
+        if buf:
+            yield pd.DataFrame.from_records(buf, columns=names)
+    finally:
+        wb.close()
+
+def iter_table_chunks(path: str, sheet: Optional[str] = None, chunk_rows: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Lê CSV/Excel em blocos de até `chunk_rows` linhas (mesmas colunas de read_table)."""
+    chunk_rows = max(1, int(chunk_rows))
+    lower = str(path).lower()
+    if lower.endswith(_EXCEL_EXTS):
+        yield from _iter_excel_chunks(str(path), sheet, chunk_rows)
+    elif lower.endswith(".xls"):
+        from advanced_filter.io.excel_io import read_table  # formato antigo: sem leitura em streaming
+        df = read_table(str(path), sheet)
+        for lo in range(0, len(df), chunk_rows):
+            yield df.iloc[lo:lo + chunk_rows]
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+# ---------- Escrita em streaming ----------
+def _cell(v: Any) -> Any:
+    """Valor de célula aceito pelo xlsxwriter (vazio para None/NaN/NaT, como o to_excel)."""
+    if v is None or v is pd.NaT:
+        return None
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, (str, bool, int, float, _dt.date, _dt.time, _dt.timedelta)):
+        return v
+    return str(v)
+
+class _CsvSink:
+    def __init__(self, out_path: pathlib.Path):
+        self.out_path = out_path
+        self.started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self.started:
+            df.to_csv(self.out_path, index=False, encoding="utf-8-sig")
+            self.started = True
+        else:
+            df.to_csv(self.out_path, index=False, header=False, mode="a", encoding="utf-8")
+
+    def close(self) -> None:
+        if not self.started:
+            pd.DataFrame().to_csv(self.out_path, index=False, encoding="utf-8-sig")
+
+class _XlsxSink:
+    """xlsxwriter em constant_memory: cada linha vai para o disco assim que é escrita."""
+
+    def __init__(self, out_path: pathlib.Path, split: bool):
+        import xlsxwriter
+        self.book = xlsxwriter.Workbook(str(out_path), {
+            "constant_memory": True,
+            "nan_inf_to_errors": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "remove_timezone": True,
+        })
+        self.bold = self.book.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        names = [s for _, s in _SPLIT_SHEETS] if split else ["Resultado"]
+        self.sheets = {name: [self.book.add_worksheet(name), 0] for name in names}
+        self.split = split
+
+    def _append(self, name: str, df: pd.DataFrame) -> None:
+        ws_row = self.sheets[name]
+        ws = ws_row[0]
+        if ws_row[1] == 0:
+            ws.write_row(0, 0, [str(c) for c in df.columns], self.bold)
+            ws_row[1] = 1
+        r = ws_row[1]
+        for values in df.itertuples(index=False, name=None):
+            ws.write_row(r, 0, [_cell(v) for v in values])
+            r += 1
+        ws_row[1] = r
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self.split:
+            self._append("Resultado", df)
+            return
+        for decision, name in _SPLIT_SHEETS:
+            self._append(name, df[df["decision"] == decision])
+
+    def close(self) -> None:
+        self.book.close()
+
+def _open_sink(out_path: pathlib.Path, fmt: str):
+    if fmt == "csv":
+        return _CsvSink(out_path)
+    if fmt in ("xlsx", "split"):
+        return _XlsxSink(out_path, split=(fmt == "split"))
+    raise ValueError(f"Formato inválido: {fmt!r} (use um de {FORMATS}).")
+
+# ---------- Pipeline ----------
+_DONE = object()
+
+def _put(q: "queue.Queue", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _acquire(sem: threading.Semaphore, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        if sem.acquire(timeout=0.1):
+            return True
+    return False
+
+def _get(q: "queue.Queue", stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def run_pipeline(src: str, text_col: str, cfg_source: CfgSource, out_path: str, fmt: str = "xlsx",
+                 sheet: Optional[str] = None, chunk_rows: int = 10_000, queue_depth: int = 4,
+                 engine_threads: int = 1, mode: str = "full", dedup: bool = False) -> Dict[str, Any]:
+    """
+    Lê `src`, filtra e grava `out_path` com os três estágios em paralelo. O arquivo gerado
+    tem as mesmas linhas e colunas de read_table + run_filter + escrita; os tipos de cada
+    coluna são inferidos por bloco. Retorna estatísticas: linhas, blocos, tempo total e
+    tempo ocupado de cada estágio (read_s, engine_s, write_s) e contagem por decisão.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt!r} (use um de {FORMATS}).")
+    profile = resolve_profile(cfg_source)
+    depth = max(1, int(queue_depth))
+    n_engine = max(1, int(engine_threads))
+    q_in: "queue.Queue" = queue.Queue(maxsize=depth)
+    q_out: "queue.Queue" = queue.Queue(maxsize=depth)
+    in_flight = threading.Semaphore(depth + n_engine)  # blocos lidos e ainda não gravados
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    lock = threading.Lock()
+    stats: Dict[str, Any] = {"rows": 0, "chunks": 0, "read_s": 0.0, "engine_s": 0.0, "write_s": 0.0,
+                             "counts": {}}
+
+    def _fail(e: BaseException) -> None:
+        with lock:
+            errors.append(e)
+        stop.set()
+
+    def reader() -> None:
+        try:
+            seq = 0
+            it = iter_table_chunks(src, sheet, chunk_rows)
+            while True:
+                if not _acquire(in_flight, stop):  # antes de ler: o bloco lido já conta
+                    return
+                t0 = time.perf_counter()
+                chunk = next(it, None)
+                stats["read_s"] += time.perf_counter() - t0
+                if chunk is None:
+                    in_flight.release()
+                    break
+                if seq == 0 and text_col not in chunk.columns:
+                    raise ValueError(f"Coluna '{text_col}' não encontrada em {src}.")
+                if not _put(q_in, (seq, chunk), stop):
+                    return
+                seq += 1
+            for _ in range(n_engine):
+                _put(q_in, _DONE, stop)
+        except BaseException as e:
+            _fail(e)
+
+    def engine() -> None:
+        try:
+            while True:
+                item = _get(q_in, stop)
+                if item is _DONE:
+                    _put(q_out, _DONE, stop)
+                    return
+                seq, chunk = item
+                t0 = time.perf_counter()
+                result = run_filter(chunk, text_col, profile, chunk_size=max(1, len(chunk)),
+                                    dedup=dedup, mode=mode)
+                with lock:
+                    stats["engine_s"] += time.perf_counter() - t0
+                if not _put(q_out, (seq, result), stop):
+                    return
+        except BaseException as e:
+            _fail(e)
+
+    def writer() -> None:
+        sink = None
+        try:
+            sink = _open_sink(pathlib.Path(out_path), fmt)
+            pending: Dict[int, pd.DataFrame] = {}
+            nxt, finished = 0, 0
+            while finished < n_engine:
+                item = _get(q_out, stop)
+                if item is _DONE:
+                    if stop.is_set():
+                        return
+                    finished += 1
+                    continue
+                seq, result = item
+                pending[seq] = result
+                while nxt in pending:  # engines em paralelo podem terminar fora de ordem
+                    df = pending.pop(nxt)
+                    t0 = time.perf_counter()
+                    sink.write(df)
+                    in_flight.release()
+                    stats["write_s"] += time.perf_counter() - t0
+                    stats["rows"] += len(df)
+                    stats["chunks"] += 1
+                    for k, v in df["decision"].value_counts().items():
+                        stats["counts"][k] = stats["counts"].get(k, 0) + int(v)
+                    nxt += 1
+        except BaseException as e:
+            _fail(e)
+        finally:
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception as e:
+                    if not errors:
+                        _fail(e)
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=reader, name="pipeline-read", daemon=True)]
+    threads += [threading.Thread(target=engine, name=f"pipeline-engine-{i}", daemon=True) for i in range(n_engine)]
+    threads.append(threading.Thread(target=writer, name="pipeline-write", daemon=True))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats["wall_s"] = time.perf_counter() - t_start
+    if errors:
+        pathlib.Path(out_path).unlink(missing_ok=True)  # não deixa arquivo pela metade
+        raise errors[0]
+    return stats
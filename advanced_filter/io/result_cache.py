@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de resultados de execuções inteiras, endereçado por conteúdo.
+
+Chave = (file_hash, cfg_hash, aba, coluna de texto, ENGINE_VERSION): mesmo arquivo + mesmo
+perfil + mesmas opções → mesmo resultado. Compartilhado entre sessões do processo
+(memória) e entre processos/reinícios (disco, em ~/.filtro_avancado/resultados), com
+limite de tamanho nos dois níveis (remove os menos usados). Na memória o limite é por
+bytes estimados (DataFrame com memory_usage(deep=True) + bytes do xlsx): resultados
+maiores que o limite ficam só no disco.
+
+Execuções concorrentes com a mesma chave são serializadas por `lock(key)`: a 1ª calcula,
+as demais acham o resultado pronto ao entrar (single-flight).
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+import tempfile
+import threading
+
+from advanced_filter.core.engine import ENGINE_VERSION
+
+DEFAULT_RESULT_DIR = pathlib.Path.home() / ".filtro_avancado" / "resultados"
+_SUFFIX = ".pkl"
+
+def result_key(file_hash: str, cfg_hash: str, sheet: Optional[str], text_col: str) -> str:
+    raw = "\x1f".join([str(file_hash), str(cfg_hash), str(sheet or ""), str(text_col), ENGINE_VERSION])
+    return f"v{ENGINE_VERSION}-" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+class ResultCache:
+    """
+    Memória (LRU com até `max_memory` entradas e `max_memory_bytes` estimados) + disco
+    (até `max_bytes`, poda pelos acessados há mais tempo). Erros de disco não interrompem
+    a execução: vira só um miss.
+    """
+
+    def __init__(self, base_dir: Optional[pathlib.Path] = DEFAULT_RESULT_DIR,
+                 max_bytes: int = 512 * 1024 * 1024, max_memory: int = 4,
+                 max_memory_bytes: int = 256 * 1024 * 1024):
+        self.base_dir = pathlib.Path(base_dir) if base_dir is not None else None
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_memory = max(1, int(max_memory))
+        self.max_memory_bytes = max(0, int(max_memory_bytes))
+        self._mem: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()  # chave -> (valor, bytes)
+        self._mem_bytes = 0
+        self._guard = threading.Lock()
+        self._locks: Dict[str, List[Any]] = {}  # chave -> [Lock, nº de interessados]
+        self.stats = {"memory": 0, "disk": 0, "miss": 0}
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Exclusão mútua por chave (single-flight entre sessões/threads)."""
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._locks.pop(key, None)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._guard:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.stats["memory"] += 1
+                return self._mem[key][0]
+        value = self._load(key)
+        if value is None:
+            with self._guard:
+                self.stats["miss"] += 1
+            return None
+        size = _estimate_bytes(value)
+        with self._guard:
+            self.stats["disk"] += 1
+            self._remember(key, value, size)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        size = _estimate_bytes(value)  # fora do lock: percorre as colunas de texto
+        with self._guard:
+            self._remember(key, value, size)
+        self._store(key, value)
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old[1]
+        if size > self.max_memory_bytes:
+            return  # grande demais para a memória: fica só no disco
+        self._mem[key] = (value, size)
+        self._mem_bytes += size
+        while len(self._mem) > self.max_memory or self._mem_bytes > self.max_memory_bytes:
+            self._mem_bytes -= self._mem.popitem(last=False)[1][1]
+
+    # ---------- Disco ----------
+    def _path(self, key: str) -> Optional[pathlib.Path]:
+        return self.base_dir / (key + _SUFFIX) if self.base_dir is not None else None
+
+    def _load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+            os.utime(path)  # "acessado agora" para a poda
+            return value
+        except Exception:
+            return None
+
+    def _store(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        if path is None or self.max_bytes <= 0:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._prune()
+        except Exception:
+            pass
+
+    def _prune(self) -> None:
+        """Remove outras versões do engine e os menos usados até caber em `max_bytes`."""
+        prefix = f"v{ENGINE_VERSION}-"
+        files = []
+        for p in self.base_dir.glob("*" + _SUFFIX):
+            if not p.name.startswith(prefix):
+                p.unlink(missing_ok=True)
+                continue
+            st = p.stat()
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+def _estimate_bytes(value: Any) -> int:
+    """Tamanho aproximado em memória de um resultado ({"result": DataFrame, "xlsx": bytes})."""
+    if hasattr(value, "memory_usage"):
+        try:
+            return int(value.memory_usage(deep=True).sum())
+        except Exception:
+            return sys.getsizeof(value)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+_default_cache: Optional[ResultCache] = None
+_default_guard = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    """Cache padrão do processo (compartilhado por todas as sessões do Streamlit)."""
+    global _default_cache
+    with _default_guard:
+        if _default_cache is None:
+            _default_cache = ResultCache(DEFAULT_RESULT_DIR)
+        return _default_cache
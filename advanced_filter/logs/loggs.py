@@ -2,38 +2,143 @@
 # -*- coding: utf-8 -*-
 """
 Lightweight logging utilities for Streamlit apps:
-- RotatingFileHandler -> logs/app.log
+- Non-blocking pipeline: QueueHandler (script thread) -> QueueListener (background
+  thread) -> RotatingFileHandler logs/app.log + stdout
+- Lazy formatting: payloads are only turned into text by the background writer
+- Level, sampling rate and output format configurable (env or configure_logging):
+    FILTRO_LOG_LEVEL   DEBUG | INFO | WARNING ...   (default DEBUG)
+    FILTRO_LOG_SAMPLE  0..1, fraction of DEBUG/INFO records kept (default 1.0)
+    FILTRO_LOG_FORMAT  text | json  (json = one JSON object per line)
 - Session and render sequence context (to trace reruns)
-- Helpers: mark_event, log_state, trace, safe_rerun
+- Helpers: mark_event, log_state, trace (also feeds logs/metrics.py), safe_rerun
 """
 
 from __future__ import annotations
+import atexit
+import json
 import logging
 import os
+import queue
+import random
 import sys
 import time
 import uuid
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Any, Dict, Iterable, Optional
 
+try:
+    from . import metrics
+except Exception:
+    import metrics  # type: ignore
+
 # ---------- Global logger config ----------
 _LOGGERS: Dict[str, logging.Logger] = {}
 _LOG_DIR = os.path.join(os.getcwd(), "logs")
 _LOG_FILE = os.path.join(_LOG_DIR, "app.log")
 _MAX_BYTES = 1_000_000  # ~1MB
 _BACKUP_COUNT = 5
+_QUEUE_SIZE = 10_000
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_NonBlockingQueueHandler"] = None
+
+class _Payload:
+    """Event fields; rendered as text only when (and if) a handler writes the record."""
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return _fmt(self.fields)
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Never blocks the script thread: full queue -> record dropped (and counted)."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # no formatting here (the default prepare() formats in the calling thread)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _SamplingFilter(logging.Filter):
+    """Keeps a fraction `rate` of records below WARNING; warnings/errors always pass."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+class _JsonFormatter(logging.Formatter):
+    """JSON lines: ts/level/logger + event fields (or msg)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if len(record.args or ()) == 1 and isinstance(record.args[0], _Payload):  # type: ignore[index]
+            out.update(record.args[0].fields)  # type: ignore[index]
+        else:
+            out["msg"] = record.getMessage()
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+def _level_from(value: Any, default: int) -> int:
+    if isinstance(value, int):
+        return value
+    lv = logging.getLevelName(str(value or "").upper())
+    return lv if isinstance(lv, int) else default
+
+def _stop_listener() -> None:
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        try:
+            listener.stop()  # flushes whatever is still queued
+        except AttributeError:
+            pass  # already stopped
+
+def configure_logging(level: Any = None, sample_rate: Optional[float] = None, json_lines: Optional[bool] = None) -> None:
+    """(Re)configure level, sampling rate and format; None = env value / default."""
+    global _listener, _queue_handler
+    level = _level_from(level if level is not None else os.environ.get("FILTRO_LOG_LEVEL"), logging.DEBUG)
+    if sample_rate is None:
+        try:
+            sample_rate = float(os.environ.get("FILTRO_LOG_SAMPLE", "1"))
+        except ValueError:
+            sample_rate = 1.0
+    if json_lines is None:
+        json_lines = os.environ.get("FILTRO_LOG_FORMAT", "text").lower() == "json"
 
-def _ensure_handlers(level: int = logging.DEBUG) -> None:
-    os.makedirs(_LOG_DIR, exist_ok=True)
     root = logging.getLogger()
-    if getattr(root, "__streamlit_handlers_configured__", False):
-        return
-    root.setLevel(level)
+    if _queue_handler is not None:  # reconfiguring: drain the queue and swap the pipeline
+        _stop_listener()
+        root.removeHandler(_queue_handler)
 
-    fmt = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    os.makedirs(_LOG_DIR, exist_ok=True)
+    if json_lines:
+        fmt: logging.Formatter = _JsonFormatter()
+    else:
+        fmt = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
     fh = RotatingFileHandler(_LOG_FILE, maxBytes=_MAX_BYTES, backupCount=_BACKUP_COUNT, encoding="utf-8")
     fh.setFormatter(fmt)
@@ -43,10 +148,25 @@ def _ensure_handlers(level: int = logging.DEBUG) -> None:
     ch.setFormatter(fmt)
     ch.setLevel(level)
 
-    root.addHandler(fh)
-    root.addHandler(ch)
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=_QUEUE_SIZE)
+    _queue_handler = _NonBlockingQueueHandler(q)
+    _queue_handler.setLevel(level)
+    _queue_handler.addFilter(_SamplingFilter(max(0.0, min(1.0, float(sample_rate)))))
+    _listener = QueueListener(q, fh, ch, respect_handler_level=True)
+    _listener.start()
+
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
     root.__streamlit_handlers_configured__ = True  # type: ignore[attr-defined]
 
+atexit.register(_stop_listener)
+
+def _ensure_handlers(level: Optional[int] = None) -> None:
+    root = logging.getLogger()
+    if getattr(root, "__streamlit_handlers_configured__", False):
+        return
+    configure_logging(level)
+
 def get_logger(name: str = "app") -> logging.Logger:
     if name in _LOGGERS:
         return _LOGGERS[name]
@@ -85,10 +205,11 @@ def get_session_id() -> str:
 
 def bump_render_seq(logger: Optional[logging.Logger] = None) -> int:
     seq = int(_ss_get(RENDER_SEQ_KEY, 0)) + 1
+    metrics.inc("renders")
     _ss_set(RENDER_SEQ_KEY, seq)
     _ss_set(RENDER_TS_KEY, time.time())
-    if logger:
-        logger.debug(f"render_start seq={seq} sid={get_session_id()}")
+    if logger and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("render_start seq=%s sid=%s", seq, get_session_id())
     return seq
 
 def get_render_seq() -> int:
@@ -106,13 +227,15 @@ def _fmt(d: Dict[str, Any]) -> str:
     return " | " + " | ".join(parts)
 
 def mark_event(logger: logging.Logger, event: str, **kwargs: Any) -> None:
+    if not logger.isEnabledFor(logging.INFO):
+        return
     sid = get_session_id()
     seq = get_render_seq()
     payload = {"event": event, "sid": sid, "seq": seq, **kwargs}
-    logger.info(_fmt(payload))
+    logger.info("%s", _Payload(payload))  # formatted by the background writer only
 
 def log_state(logger: logging.Logger, keys: Optional[Iterable[str]] = None, prefix: str = "state") -> None:
-    if st is None:
+    if st is None or not logger.isEnabledFor(logging.INFO):
         return
     if keys is None:
         keys = [
@@ -129,18 +252,31 @@ def log_state(logger: logging.Logger, keys: Optional[Iterable[str]] = None, pref
             snapshot[k] = v
     mark_event(logger, prefix, **snapshot)
 
+_CONTROL_FLOW_EXCEPTIONS = {"StopException", "RerunException"}
+
 def trace(logger: logging.Logger, name: str):
+    """Logs start/end (DEBUG) and feeds the `name` latency histogram + counters in metrics."""
     def _decor(fn):
         def _wrap(*args, **kwargs):
-            sid = get_session_id()
-            seq = get_render_seq()
-            t0 = time.time()
-            logger.debug(_fmt({"event": f"{name}:start", "sid": sid, "seq": seq}))
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                sid = get_session_id()
+                seq = get_render_seq()
+                logger.debug("%s", _Payload({"event": f"{name}:start", "sid": sid, "seq": seq}))
+            metrics.inc(f"{name}:calls")
+            t0 = time.perf_counter()
             try:
                 return fn(*args, **kwargs)
+            except BaseException as e:
+                # st.stop()/st.rerun() are control flow, not failures
+                if type(e).__name__ not in _CONTROL_FLOW_EXCEPTIONS:
+                    metrics.inc(f"{name}:errors")
+                raise
             finally:
-                dt = (time.time() - t0) * 1000
-                logger.debug(_fmt({"event": f"{name}:end", "sid": sid, "seq": seq, "ms": round(dt, 2)}))
+                dt = (time.perf_counter() - t0) * 1000
+                metrics.observe(name, dt)
+                if debug:
+                    logger.debug("%s", _Payload({"event": f"{name}:end", "sid": sid, "seq": seq, "ms": round(dt, 2)}))
         return _wrap
     return _decor
 
@@ -0,0 +1,199 @@
+# logs/metrics.py
+# -*- coding: utf-8 -*-
+"""
+In-process metrics (stdlib only), fed by `loggs.trace` and engine stages:
+- Counters and latency histograms (ms) per name, with p50/p95/p99
+- Shared by every Streamlit session of the process
+- Periodically flushed by a background thread to logs/metrics.prom (Prometheus
+  text format) and logs/metrics.json; interval via FILTRO_METRICS_FLUSH_S
+  (default 30 s, 0 disables the file export)
+- The export is opt-in: the Streamlit app calls enable_export(); other processes
+  (CLI, service, benchmarks) only export when FILTRO_METRICS_DIR is set. Pool
+  workers never export (their registry is partial)
+"""
+
+from __future__ import annotations
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Bucket upper bounds in ms: 0.1 ms .. ~210 s, x2 per bucket (+ overflow)
+BUCKETS_MS: List[float] = [0.1 * (2 ** i) for i in range(22)]
+
+_METRICS_DIR = os.path.join(os.getcwd(), "logs")
+_FILE_MODE = 0o644  # mkstemp creates 0600; the exported files are meant to be scraped/read
+
+class Histogram:
+    """Fixed exponential buckets; percentiles interpolated inside the bucket."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS_MS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+                return min(self.max, lo + (hi - lo) * (rank - seen) / c)
+            seen += c
+        return self.max
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram()
+            h.observe(ms)
+        _ensure_flusher()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{"counters": {...}, "latency_ms": {name: {count, mean, p50, p95, p99, max}}}."""
+        with self._lock:
+            lat = {
+                name: {
+                    "count": h.count,
+                    "mean": h.total / h.count if h.count else 0.0,
+                    "p50": h.percentile(0.50),
+                    "p95": h.percentile(0.95),
+                    "p99": h.percentile(0.99),
+                    "max": h.max,
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+            return {"since": self.started, "counters": dict(sorted(self.counters.items())), "latency_ms": lat}
+
+    def to_prometheus(self, prefix: str = "filtro") -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, v in sorted(self.counters.items()):
+                metric = f"{prefix}_{_sanitize(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {v}"]
+            for name, h in sorted(self.histograms.items()):
+                metric = f"{prefix}_{_sanitize(name)}_ms"
+                lines.append(f"# TYPE {metric} histogram")
+                cum = 0
+                for ub, c in zip(BUCKETS_MS, h.counts):
+                    cum += c
+                    lines.append(f'{metric}_bucket{{le="{ub:g}"}} {cum}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.total}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower() or "unnamed"
+
+REGISTRY = Registry()
+
+def inc(name: str, value: float = 1) -> None:
+    REGISTRY.inc(name, value)
+
+def observe(name: str, ms: float) -> None:
+    REGISTRY.observe(name, ms)
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Records the block duration in the `name` histogram (also on exceptions)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, (time.perf_counter() - t0) * 1000.0)
+
+def snapshot() -> Dict[str, Any]:
+    return REGISTRY.snapshot()
+
+# ---------- Periodic export ----------
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_export_dir: Optional[str] = os.environ.get("FILTRO_METRICS_DIR") or None
+
+def enable_export(directory: Optional[str] = None) -> None:
+    """Turns on the periodic file export (to `directory`, default logs/ under the cwd)."""
+    global _export_dir
+    _export_dir = directory or _export_dir or _METRICS_DIR
+
+def _write_atomic(path: str, data: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.chmod(tmp, _FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def flush_metrics(directory: Optional[str] = None) -> None:
+    """Writes metrics.prom and metrics.json now."""
+    directory = directory or _export_dir or _METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(os.path.join(directory, "metrics.prom"), REGISTRY.to_prometheus())
+    _write_atomic(os.path.join(directory, "metrics.json"), json.dumps(REGISTRY.snapshot(), indent=2))
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            flush_metrics()
+        except Exception:
+            pass  # export is best-effort; never disturbs the app
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None or _export_dir is None:
+        return
+    if multiprocessing.parent_process() is not None:
+        return  # pool worker: would overwrite the parent's files with a partial registry
+    with _flusher_lock:
+        if _flusher is not None:
+            return
+        try:
+            interval = float(os.environ.get("FILTRO_METRICS_FLUSH_S", "30"))
+        except ValueError:
+            interval = 30.0
+        _flusher = threading.Thread(target=_flush_loop, args=(interval,), name="metrics-flush", daemon=True)
+        if interval > 0:
+            _flusher.start()
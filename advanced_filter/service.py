@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço HTTP local (asyncio, só stdlib) para classificar textos avulsos com perfis
+mantidos compilados em memória — sem Streamlit e sem pandas.
+
+  python -m advanced_filter.service --port 8765 --profiles-dir perfis
+
+  POST /classify  {"profile": "Manutencao_Motor", "text": "troca do motor"}
+                  {"profile": "Manutencao_Motor", "texts": ["...", "..."]}
+                  {"profile_yaml": "positives: [motor]\\n", "text": "..."}
+       -> {"profile": ..., "results": [{<mesmas colunas de run_filter>}, ...]}
+  GET  /health    -> perfis carregados e estatísticas dos lotes
+
+Requisições concorrentes para o mesmo perfil são agrupadas (micro-batching): o lote
+junta o que chegar em até `max_wait_ms` (ou `max_batch` textos) e vai numa única
+chamada ao engine, fora do event loop.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+import time
+import urllib.request
+
+from advanced_filter.core.engine import CompiledProfile, RESULT_COLUMNS, classify_texts
+from advanced_filter.core.profile_cache import ProfileCache, get_profile_cache, profile_key
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+def _rows(cols: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Colunas do engine -> uma dict por texto, com tipos nativos (JSON)."""
+    values = [cols[c].tolist() if hasattr(cols[c], "tolist") else cols[c] for c in RESULT_COLUMNS]
+    return [dict(zip(RESULT_COLUMNS, row)) for row in zip(*values)]
+
+# ---------- Micro-batching ----------
+class _Batcher:
+    """Fila de um perfil: agrupa pedidos concorrentes numa única chamada ao engine."""
+
+    def __init__(self, profile: CompiledProfile, max_batch: int, max_wait: float, chunk_size: int):
+        self.profile = profile
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.chunk_size = chunk_size
+        self.queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self.stats = {"batches": 0, "requests": 0, "texts": 0, "engine_seconds": 0.0}
+        self.in_flight = 0  # pedidos aceitos e ainda sem resposta (na fila, no lote ou no engine)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0
+
+    async def submit(self, texts: List[str]) -> List[Dict[str, Any]]:
+        fut = asyncio.get_running_loop().create_future()
+        self.in_flight += 1
+        try:
+            await self.queue.put((texts, fut))
+            return await fut
+        finally:
+            self.in_flight -= 1
+
+    async def _collect(self) -> List[Tuple[List[str], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        n = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while n < self.max_batch:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(item)
+            n += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [t for ts, _ in batch for t in ts]
+            t0 = time.perf_counter()
+            try:
+                cols = await loop.run_in_executor(None, classify_texts, texts, self.profile, self.chunk_size)
+                rows = _rows(cols)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["engine_seconds"] += time.perf_counter() - t0
+            i = 0
+            for ts, fut in batch:
+                if not fut.done():
+                    fut.set_result(rows[i:i + len(ts)])
+                i += len(ts)
+
+    def close(self) -> None:
+        """Encerra o lote; pedidos ainda na fila recebem erro em vez de esperar para sempre."""
+        self._task.cancel()
+        while not self.queue.empty():
+            _, fut = self.queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(HTTPError(503, "Perfil descarregado; tente de novo."))
+
+# ---------- Serviço ----------
+class ClassificationService:
+    """
+    Perfis por nome (arquivos `<nome>.yaml|.yml` em `profiles_dir`, recarregados quando o
+    arquivo muda) ou YAML inline; um _Batcher por conteúdo de perfil.
+    """
+
+    def __init__(self, profiles_dir: Optional[pathlib.Path] = None, max_batch: int = 256,
+                 max_wait_ms: float = 2.0, chunk_size: int = 10_000, cache: Optional[ProfileCache] = None,
+                 max_profiles: int = 64):
+        self.profiles_dir = pathlib.Path(profiles_dir) if profiles_dir else None
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.chunk_size = chunk_size
+        self.max_profiles = max(1, int(max_profiles))
+        self.cache = cache if cache is not None else get_profile_cache()
+        self._batchers: Dict[str, _Batcher] = {}
+        self._files: Dict[str, Tuple[float, str]] = {}  # nome -> (mtime, chave)
+
+    def _profile_path(self, name: str) -> pathlib.Path:
+        if self.profiles_dir is None or not name or "/" in name or "\\" in name or name.startswith("."):
+            raise HTTPError(404, f"Perfil não encontrado: {name}")
+        for ext in (".yaml", ".yml"):
+            p = self.profiles_dir / (name + ext)
+            if p.is_file():
+                return p
+        raise HTTPError(404, f"Perfil não encontrado: {name}")
+
+    def _load_profile(self, yaml_bytes: bytes) -> CompiledProfile:
+        try:
+            return self.cache.get(yaml_bytes)
+        except Exception as e:
+            raise HTTPError(400, f"Perfil inválido: {e}")
+
+    def _install(self, key: str, profile: CompiledProfile) -> _Batcher:
+        b = self._batchers.get(key)
+        if b is None:  # outra requisição pode ter carregado o mesmo perfil enquanto este compilava
+            b = self._batchers[key] = _Batcher(profile, self.max_batch, self.max_wait, self.chunk_size)
+            self._evict()
+        return b
+
+    def _batcher_for(self, yaml_bytes: bytes) -> _Batcher:
+        """Versão síncrona (preload, antes de atender conexões)."""
+        key = profile_key(yaml_bytes)
+        b = self._batchers.get(key)
+        return b if b is not None else self._install(key, self._load_profile(yaml_bytes))
+
+    async def _batcher_for_async(self, yaml_bytes: bytes) -> _Batcher:
+        """Como _batcher_for, mas o unpickle/compilação do cache roda fora do event loop."""
+        key = profile_key(yaml_bytes)
+        b = self._batchers.get(key)
+        if b is None:
+            loop = asyncio.get_running_loop()
+            profile = await loop.run_in_executor(None, self._load_profile, yaml_bytes)
+            b = self._install(key, profile)
+        return b
+
+    def _evict(self) -> None:
+        """Limita os perfis em memória (YAML inline/versões antigas), sem tocar nos nomeados."""
+        named = {key for _, key in self._files.values()}
+        for key in list(self._batchers):
+            if len(self._batchers) <= self.max_profiles:
+                break
+            b = self._batchers[key]
+            if key not in named and b.idle:  # fila vazia não basta: o lote pode estar no engine
+                b.close()
+                del self._batchers[key]
+
+    def _named(self, name: str) -> Tuple[pathlib.Path, float, Optional[_Batcher]]:
+        """(arquivo, mtime, batcher já carregado para esse mtime ou None)."""
+        path = self._profile_path(name)
+        mtime = path.stat().st_mtime
+        known = self._files.get(name)
+        if known is not None and known[0] == mtime and known[1] in self._batchers:
+            return path, mtime, self._batchers[known[1]]
+        return path, mtime, None
+
+    def batcher_by_name(self, name: str) -> _Batcher:
+        path, mtime, b = self._named(name)
+        if b is None:
+            data = path.read_bytes()
+            b = self._batcher_for(data)
+            self._files[name] = (mtime, profile_key(data))
+        return b
+
+    async def batcher_by_name_async(self, name: str) -> _Batcher:
+        path, mtime, b = self._named(name)
+        if b is None:
+            data = path.read_bytes()
+            b = await self._batcher_for_async(data)
+            self._files[name] = (mtime, profile_key(data))
+        return b
+
+    def preload(self) -> List[str]:
+        """Compila todos os perfis do diretório (deixa o serviço 'quente')."""
+        names = []
+        if self.profiles_dir is not None and self.profiles_dir.is_dir():
+            for p in sorted(self.profiles_dir.iterdir()):
+                if p.suffix.lower() in (".yaml", ".yml") and not p.name.startswith("."):
+                    try:
+                        self.batcher_by_name(p.stem)
+                        names.append(p.stem)
+                    except HTTPError:
+                        continue
+        return names
+
+    async def classify(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Corpo deve ser um objeto JSON.")
+        if "texts" in payload:
+            texts = payload["texts"]
+            if not isinstance(texts, list):
+                raise HTTPError(400, "'texts' deve ser uma lista.")
+        elif "text" in payload:
+            texts = [payload["text"]]
+        else:
+            raise HTTPError(400, "Informe 'text' ou 'texts'.")
+        texts = ["" if t is None else str(t) for t in texts]
+
+        if payload.get("profile_yaml") is not None:
+            batcher = await self._batcher_for_async(str(payload["profile_yaml"]).encode("utf-8"))
+            name = None
+        elif payload.get("profile"):
+            name = str(payload["profile"])
+            batcher = await self.batcher_by_name_async(name)
+        else:
+            raise HTTPError(400, "Informe 'profile' ou 'profile_yaml'.")
+
+        results = await batcher.submit(texts) if texts else []
+        return {"profile": name, "results": results}
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "profiles": sorted(self._files),
+            "batchers": [b.stats for b in self._batchers.values()],
+        }
+
+    # ---------- HTTP ----------
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET.")
+            return 200, self.health()
+        if path == "/classify":
+            if method != "POST":
+                raise HTTPError(405, "Use POST.")
+            try:
+                payload = json.loads(body.decode("utf-8") or "null")
+            except ValueError:
+                raise HTTPError(400, "JSON inválido.")
+            return 200, await self.classify(payload)
+        raise HTTPError(404, f"Rota não encontrada: {path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Uma conexão HTTP/1.1 (com keep-alive)."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    try:
+                        length = int(headers.get("content-length") or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        keep_alive = False  # sem tamanho confiável não dá para achar a próxima requisição
+                        raise HTTPError(400, "Content-Length inválido.")
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, "Corpo grande demais.")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method.upper(), target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"filtro-avancado: ouvindo em http://{host}:{port} (perfis: {', '.join(self.preload()) or '-'})")
+        async with server:
+            await server.serve_forever()
+
+# ---------- Cliente local ----------
+def request_classify(url: str, payload: Dict[str, Any], timeout: float = 30.0) -> Dict[str, Any]:
+    """POST /classify a partir de outra ferramenta (urllib, sem dependências)."""
+    req = urllib.request.Request(
+        url.rstrip("/") + "/classify",
+        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="filtro-avancado-servico", description="Serviço local de classificação.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--profiles-dir", default=str(pathlib.Path.home() / ".filtro_avancado" / "perfis"),
+                    help="pasta com os perfis YAML (nome do arquivo = nome do perfil)")
+    ap.add_argument("--max-batch", type=int, default=256, help="textos por lote do engine")
+    ap.add_argument("--max-wait-ms", type=float, default=2.0, help="espera máx. para juntar um lote")
+    args = ap.parse_args(argv)
+    svc = ClassificationService(pathlib.Path(args.profiles_dir), max_batch=args.max_batch,
+                                max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(svc.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
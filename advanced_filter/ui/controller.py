@@ -6,12 +6,16 @@ import unicodedata
 import pandas as pd
 
 try:
-    from ..engine import run_filter, compile_terms, normalize_text, find_matches
+    from ..engine import run_filter, compile_profile, CompiledProfile
+    from ..profile_cache import get_compiled_profile
     from ..config_loader import load_config
+    from ..preprocessor import TokenizedText
     from ..excel_io import read_table
 except Exception:
-    from engine import run_filter, compile_terms, normalize_text, find_matches  # type: ignore
+    from engine import run_filter, compile_profile, CompiledProfile  # type: ignore
+    from profile_cache import get_compiled_profile  # type: ignore
     from config_loader import load_config  # type: ignore
+    from preprocessor import TokenizedText  # type: ignore
 
     def read_table(path: str, sheet: Optional[str] = None) -> pd.DataFrame:  # type: ignore
         import pandas as _pd
@@ -138,9 +142,10 @@ def _apply_spans_on_original(original_text: str, spans: List[Tuple[int, int, str
         out.append("</span>")
     return "".join(out)
 
-def build_highlight_html(original_text: str, cfg: Dict[str, Any]) -> Tuple[str, str, Dict[str, int]]:
+def build_highlight_html(original_text: str, cfg: Dict[str, Any], profile: Optional[CompiledProfile] = None) -> Tuple[str, str, Dict[str, int]]:
     """
     Retorna (html_original_com_realce, html_normalizado_com_realce, contagens).
+    `profile` evita recompilar quando o chamador já tem o perfil compilado de `cfg`.
     """
     norm = cfg.get("normalization", {}) or {}
     lower = bool(norm.get("lowercase", True))
@@ -151,17 +156,11 @@ def build_highlight_html(original_text: str, cfg: Dict[str, Any]) -> Tuple[str,
         original_text, lowercase=lower, strip_accents=strip
     )
 
-    # Normalizar termos antes de compilar (igual ao engine)
-    def _norm_terms(terms):
-        return [normalize_text(t, lowercase=lower, strip_accents=strip) for t in (terms or [])]
-
-    pos_rgx = compile_terms(_norm_terms(cfg.get("positives")))
-    neg_rgx = compile_terms(_norm_terms(cfg.get("negatives")))
-    ctx_rgx = compile_terms(_norm_terms(cfg.get("contexts")))
-
-    pos = find_matches(text_norm, pos_rgx)
-    neg = find_matches(text_norm, neg_rgx)
-    ctx = find_matches(text_norm, ctx_rgx)
+    # Mesmo perfil compilado do engine (coringas "prefixo*" e plurais inclusos)
+    if profile is None:
+        profile = compile_profile(cfg)
+    tt = TokenizedText(text_norm)  # uma única estrutura para as três classes
+    pos, neg, ctx = profile.match(tt)
 
     counts = {"positivos": len(pos), "negativos": len(neg), "contextos": len(ctx)}
 
@@ -215,11 +214,12 @@ def build_highlight_html(original_text: str, cfg: Dict[str, Any]) -> Tuple[str,
 
 # --------------- Teste rápido ---------------
 def quick_test_highlight(sample_text: str, text_col: str, cfg_bytes: bytes, cfg_name: Optional[str]):
-    cfg = load_config(cfg_bytes)
+    profile = get_compiled_profile(cfg_bytes)  # cache em disco/memória (por hash do YAML)
+    cfg = profile.cfg
     df = pd.DataFrame([{text_col: sample_text}])
-    result = run_filter(df, text_col, cfg)
+    result = run_filter(df, text_col, profile)
     row = result.iloc[0].to_dict()
-    html_orig, html_norm, counts = build_highlight_html(sample_text, cfg)
+    html_orig, html_norm, counts = build_highlight_html(sample_text, cfg, profile=profile)
     debug = {
         "require_context": cfg.get("require_context", False),
         "negative_wins_ties": cfg.get("negative_wins_ties", True),
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# advanced_filter/ui/diagnostics_view.py
+from __future__ import annotations
+import time
+import pandas as pd
+import streamlit as st
+
+from advanced_filter.logs import metrics
+
+def _latency_frame(snap: dict) -> pd.DataFrame:
+    rows = []
+    for name, h in snap.get("latency_ms", {}).items():
+        rows.append({
+            "etapa": name,
+            "chamadas": h["count"],
+            "média (ms)": round(h["mean"], 2),
+            "p50 (ms)": round(h["p50"], 2),
+            "p95 (ms)": round(h["p95"], 2),
+            "p99 (ms)": round(h["p99"], 2),
+            "máx (ms)": round(h["max"], 2),
+        })
+    return pd.DataFrame(rows)
+
+def render_diagnostics_tab():
+    """Painel "Diagnóstico": latências (p50/p95/p99) e contadores de todas as sessões do processo."""
+    st.markdown("### Diagnóstico")
+    snap = metrics.snapshot()
+    since = time.strftime("%d/%m/%Y %H:%M:%S", time.localtime(snap["since"]))
+    st.caption(f"Métricas em memória deste servidor desde {since} (todas as sessões). "
+               f"Exportadas periodicamente em `logs/metrics.prom` e `logs/metrics.json`.")
+
+    lat = _latency_frame(snap)
+    if lat.empty:
+        st.info("Nenhuma medição ainda. Rode o filtro ou o Teste Rápido para gerar dados.")
+    else:
+        st.dataframe(lat, use_container_width=True, hide_index=True)
+
+    if snap["counters"]:
+        st.markdown("**Contadores**")
+        st.dataframe(
+            pd.DataFrame([{"nome": k, "valor": v} for k, v in snap["counters"].items()]),
+            use_container_width=True, hide_index=True,
+        )
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.download_button(
+            "Baixar métricas (Prometheus)", metrics.REGISTRY.to_prometheus().encode("utf-8"),
+            file_name="metrics.prom", use_container_width=True, key="__diag_dl_prom",
+        )
+    with c2:
+        if st.button("Zerar métricas", use_container_width=True, key="__diag_reset"):
+            metrics.REGISTRY.reset()
+            st.rerun()
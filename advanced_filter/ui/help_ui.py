@@ -146,6 +146,7 @@ def _section_rules_yaml():
     st.markdown(
         "- *minuscula* (bool): converte tudo para minúsculas antes de comparar.\n"
         "- *acentos* (bool): normaliza acentos (ex.: “pressão” ≈ “pressao”).\n"
+        "- *plurais* (bool): também casa singular/plural regulares dos termos (ex.: “motor” ≈ “motores”, “mão” ≈ “mãos”).\n"
         "- *exigir_contexto* (bool): se *true, é obrigatório existir **pelo menos 1 termo* da lista context no texto para que *Incluir* seja possível.\n"
         "- *janela_token* (int): tamanho da *janela de proximidade* (em tokens/palavras) ao redor do contexto usada para contar *positivos* e *negativos*.\n"
         "- *min_positivos* (int): quantidade mínima de *palavras positivas* na janela para *INCLUIR*.\n"
@@ -158,6 +159,10 @@ def _section_rules_yaml():
         "- *exclude: termos **negativos* (sinal contra) — contam para min_negativos e/ou podem acionar exclusão direta em casos fortes.\n"
         "- *context: termos que **ancoram* o cenário; abrem a *janela de tokens* e, se exigir_contexto=true, são obrigatórios."
     )
+    st.markdown(
+        "Cada termo pode ser uma *palavra* (casa a palavra inteira), uma *frase* (com espaço) ou um "
+        "*prefixo* terminado em `*` — ex.: `rolament*` casa “rolamento”, “rolamentos”, “rolamentação”."
+    )
 
     st.markdown("#### Exemplo (estrutura do perfil)")
     st.code(EXAMPLE_YAML, language="yaml")
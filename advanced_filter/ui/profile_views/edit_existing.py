@@ -59,7 +59,7 @@ def render_edit_existing_tab():
             draft["window"] = st.number_input("Janela (tokens)", min_value=1, value=int(draft.get("window", 8)), step=1, key="edit_window")
 
         st.markdown("#### Opções")
-        c1, c2, c3, c4 = st.columns(4)
+        c1, c2, c3, c4, c5 = st.columns(5)
         with c1:
             draft.setdefault("normalization", {})
             draft["normalization"]["lowercase"] = st.checkbox(
@@ -77,6 +77,11 @@ def render_edit_existing_tab():
             draft["negative_wins_ties"] = st.checkbox(
                 "Negativo vence empate", value=bool(draft.get("negative_wins_ties", True)), key="edit_negwins"
             )
+        with c5:
+            draft["normalization"]["expand_plurals"] = st.checkbox(
+                "Plurais (PT)", value=bool(draft["normalization"].get("expand_plurals", False)), key="edit_plurals",
+                help="Casa também singular/plural dos termos (ex.: motor → motores, mão → mãos).",
+            )
 
         c1, c2 = st.columns(2)
         with c1:
@@ -24,7 +24,7 @@ def set_profile(name: str, profile: Dict[str, Any]) -> None:
 def make_default_profile(name: str = "Novo Perfil") -> Dict[str, Any]:
     return {
         "name": name,
-        "normalization": {"lowercase": True, "strip_accents": True},
+        "normalization": {"lowercase": True, "strip_accents": True, "expand_plurals": False},
         "window": 8,
         "require_context": False,
         "negative_wins_ties": True,
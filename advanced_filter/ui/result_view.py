@@ -1,6 +1,7 @@
 ﻿# -*- coding: utf-8 -*-
 from __future__ import annotations
 import os
+import hashlib
 import tempfile
 from io import BytesIO
 from typing import Dict, Any
@@ -14,6 +15,8 @@ _logger = get_logger("result_view")
 
 from advanced_filter.ui.controller import read_table_compat
 from advanced_filter.core.engine import run_filter
+from advanced_filter.core.profile_cache import get_compiled_profile
+from advanced_filter.io.result_cache import get_result_cache, result_key
 
 # ---- state keys ----
 RESULT_BYTES_KEY = "__result_bytes"
@@ -25,6 +28,12 @@ RUNNING_KEY      = "__engine_running"    # NEW: lock anti-reentrance
 SNAPSHOT_KEY     = "__exec_snapshot"
 LAST_DF_KEY      = "last_result_df"
 
+# threads do engine por execução (FILTRO_ENGINE_THREADS; 1 = serial)
+try:
+    ENGINE_THREADS = max(1, int(os.environ.get("FILTRO_ENGINE_THREADS", "1")))
+except ValueError:
+    ENGINE_THREADS = 1
+
 def _clear_previous_result() -> None:
     """Drop any previous artifacts (bytes, df, flags)."""
     mark_event(_logger, "clear_previous_result")
@@ -147,45 +156,65 @@ def _run_and_prepare_download_silent() -> None:
         selected_sheet = snapshot.get("sheet")
         out_name = snapshot.get("outname") or (st.session_state.get("__outname") or "resultado_filtrado.xlsx")
 
-        suffix = os.path.splitext(snapshot.get("filename", "data.xlsx"))[-1] or ".xlsx"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(data_bytes or b"")
-            tmp.flush()
-            data_path = tmp.name
-
-        # Read input
-        try:
-            df = read_table_compat(data_path, sheet=selected_sheet)
-        except Exception as e:
-            mark_event(_logger, "read_table_compat:error", err=str(e))
-            finish_processing(False)
-            safe_rerun(_logger, reason="read-error")
-            return
-
-        # Engine
-        try:
-            result = run_filter(df, text_col, cfg_bytes)
-        except Exception as e:
-            mark_event(_logger, "run_filter:error", err=str(e))
-            finish_processing(False)
-            safe_rerun(_logger, reason="engine-error")
-            return
-
-        # Save DF and bytes
-        st.session_state[LAST_DF_KEY] = result.copy()
-        try:
-            out_buf = BytesIO()
-            with pd.ExcelWriter(out_buf, engine="xlsxwriter") as writer:
-                result.to_excel(writer, index=False, sheet_name="Resultado")
-            out_buf.seek(0)
-            st.session_state[RESULT_BYTES_KEY] = out_buf.getvalue()
-            st.session_state[RESULT_NAME_KEY] = out_name
-            finish_processing(True)
-        except Exception as e:
-            mark_event(_logger, "xlsx_write:error", err=str(e))
-            st.session_state.pop(RESULT_BYTES_KEY, None)
-            st.session_state[RESULT_NAME_KEY] = out_name
-            finish_processing(False)
+        # Mesmo arquivo + perfil + aba + coluna (+ versão do engine) => mesmo resultado
+        cache = get_result_cache()
+        key = result_key(
+            snapshot.get("file_hash") or hashlib.md5(data_bytes).hexdigest(),
+            snapshot.get("cfg_hash") or hashlib.md5(cfg_bytes).hexdigest(),
+            selected_sheet, text_col,
+        )
+        with cache.lock(key):  # execuções idênticas concorrentes: só a 1ª calcula
+            hit = cache.get(key)
+            if hit is not None:
+                mark_event(_logger, "result_cache:hit", key=key)
+                st.session_state[LAST_DF_KEY] = hit["result"].copy()
+                st.session_state[RESULT_BYTES_KEY] = hit["xlsx"]
+                st.session_state[RESULT_NAME_KEY] = out_name
+                finish_processing(True)
+                safe_rerun(_logger, reason="processing-finished")
+                return
+
+            suffix = os.path.splitext(snapshot.get("filename", "data.xlsx"))[-1] or ".xlsx"
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                tmp.write(data_bytes or b"")
+                tmp.flush()
+                data_path = tmp.name
+
+            # Read input
+            try:
+                df = read_table_compat(data_path, sheet=selected_sheet)
+            except Exception as e:
+                mark_event(_logger, "read_table_compat:error", err=str(e))
+                finish_processing(False)
+                safe_rerun(_logger, reason="read-error")
+                return
+
+            # Engine
+            try:
+                result = run_filter(df, text_col, get_compiled_profile(cfg_bytes),
+                                    workers=ENGINE_THREADS, executor="thread")
+            except Exception as e:
+                mark_event(_logger, "run_filter:error", err=str(e))
+                finish_processing(False)
+                safe_rerun(_logger, reason="engine-error")
+                return
+
+            # Save DF and bytes
+            st.session_state[LAST_DF_KEY] = result.copy()
+            try:
+                out_buf = BytesIO()
+                with pd.ExcelWriter(out_buf, engine="xlsxwriter") as writer:
+                    result.to_excel(writer, index=False, sheet_name="Resultado")
+                out_buf.seek(0)
+                st.session_state[RESULT_BYTES_KEY] = out_buf.getvalue()
+                st.session_state[RESULT_NAME_KEY] = out_name
+                cache.put(key, {"result": result, "xlsx": st.session_state[RESULT_BYTES_KEY]})
+                finish_processing(True)
+            except Exception as e:
+                mark_event(_logger, "xlsx_write:error", err=str(e))
+                st.session_state.pop(RESULT_BYTES_KEY, None)
+                st.session_state[RESULT_NAME_KEY] = out_name
+                finish_processing(False)
 
         safe_rerun(_logger, reason="processing-finished")
 
@@ -1,11 +1,13 @@
 ﻿# -*- coding: utf-8 -*-
 # advanced_filter/ui/state.py
 from __future__ import annotations
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
+from collections.abc import MutableMapping
 import os, io, zipfile, pathlib
 import streamlit as st
 
 from .profiles import profile_to_yaml_bytes, yaml_bytes_to_profile
+from advanced_filter.core.profile_manifest import ProfileManifest, get_profile_manifest
 
 PROFILE_DIR = pathlib.Path.home() / ".filtro_avancado" / "perfis"
 
@@ -79,21 +81,78 @@ def save_all_profiles_to_disk(base_dir: pathlib.Path = PROFILE_DIR) -> List[path
         out.append(save_profile_to_disk(name, base_dir))
     return out
 
+class LazyProfiles(MutableMapping):
+    """
+    nome -> perfil da sessão. Os perfis do disco aparecem pelo manifesto e só são lidos e
+    parseados no 1º acesso; o que a sessão grava/edita fica só nela.
+    """
+
+    def __init__(self, manifest: ProfileManifest, initial: Optional[Dict[str, dict]] = None):
+        self.manifest = manifest
+        self._data: Dict[str, dict] = dict(initial or {})
+        self._removed: set = set()
+
+    def __getitem__(self, name: str) -> dict:
+        if name in self._data:
+            return self._data[name]
+        if name in self._removed or name not in self.manifest:
+            raise KeyError(name)
+        prof = self.manifest.load(name)
+        self._data[name] = prof
+        return prof
+
+    def __setitem__(self, name: str, prof: dict) -> None:
+        self._data[name] = prof
+        self._removed.discard(name)
+
+    def __delitem__(self, name: str) -> None:
+        found = self._data.pop(name, None) is not None
+        if name not in self._removed and name in self.manifest:
+            self._removed.add(name)
+            found = True
+        if not found:
+            raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._data or (name not in self._removed and name in self.manifest)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._data)
+        for name in self.manifest.names():
+            if name not in self._data and name not in self._removed:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def forget(self, name: str) -> None:
+        """Descarta a cópia da sessão: o próximo acesso volta a ler do disco."""
+        self._data.pop(name, None)
+        self._removed.discard(name)
+
 def load_profiles_from_disk(base_dir: pathlib.Path = PROFILE_DIR, overwrite: bool = False) -> List[str]:
+    """
+    Registra os perfis de `base_dir` na sessão sem parseá-los (via manifesto).
+    O nome é o campo `name:` do YAML ou, na falta dele, o nome do arquivo.
+    """
     ensure_init()
     if not base_dir.exists():
         return []
+    manifest = get_profile_manifest(base_dir)
+    profiles = st.session_state["profiles"]
+    if not isinstance(profiles, LazyProfiles):
+        profiles = st.session_state["profiles"] = LazyProfiles(manifest, profiles)
+
     loaded = []
-    for p in base_dir.glob("*.yaml"):
-        try:
-            prof = yaml_bytes_to_profile(p.read_bytes())
-            name = prof.get("name") or p.stem
-            if overwrite or name not in st.session_state["profiles"]:
-                prof["name"] = name
-                st.session_state["profiles"][name] = prof
+    for name in manifest.names():
+        if profiles.manifest is not manifest:
+            # sessão já ligada a outra pasta: esta entra por cópia (parse compartilhado)
+            if overwrite or name not in profiles:
+                profiles[name] = manifest.load(name)
                 loaded.append(name)
-        except Exception:
-            continue
+        elif overwrite or name not in profiles._data:
+            profiles.forget(name)
+            loaded.append(name)
     return loaded
 
 def export_profiles_zip(base_dir: pathlib.Path = PROFILE_DIR) -> bytes:
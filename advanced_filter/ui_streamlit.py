@@ -14,6 +14,8 @@ import streamlit as st
 from advanced_filter.logs.loggs import get_logger, bump_render_seq, mark_event, log_state
 from advanced_filter.ui.state import ensure_bootstrap
 from advanced_filter.ui.help_ui import render_help
+from advanced_filter.ui.diagnostics_view import render_diagnostics_tab
+from advanced_filter.logs.metrics import timed, enable_export as enable_metrics_export
 from advanced_filter.ui.controller import (
     is_excel_name,
     list_sheets_from_bytes,
@@ -31,6 +33,7 @@ from advanced_filter.ui.result_view import (
 
 st.set_page_config(page_title="Filtro Avançado", layout="wide")
 ensure_bootstrap()
+enable_metrics_export()  # logs/metrics.prom|json só a partir do app
 
 # === LOGS: início de render ===
 logger = get_logger("ui")
@@ -59,7 +62,7 @@ def _inject_css():
 _inject_css()
 
 # ---------- Tab controlado por estado ----------
-TABS = ["Teste Rápido", "Perfis", "Resultado", "Ajuda"]
+TABS = ["Teste Rápido", "Perfis", "Resultado", "Diagnóstico", "Ajuda"]
 st.session_state.setdefault("__active_tab", TABS[0])
 
 def _tab_selector():
@@ -217,9 +220,10 @@ if active == "Teste Rápido":
         st.session_state["prev_sample_text"] = current_text
         st.session_state["prev_profiles_version"] = profiles_version
         try:
-            row, _df, html_orig, _html_norm, counts, _ = quick_test_highlight(
-                current_text, text_col, cfg_bytes, cfg_name
-            )
+            with timed("quick_test"):
+                row, _df, html_orig, _html_norm, counts, _ = quick_test_highlight(
+                    current_text, text_col, cfg_bytes, cfg_name
+                )
             decision = (row.get("decision") or "").upper()
             badge_cls = "badge-exc"
             if decision == "INCLUI": badge_cls = "badge-inc"
@@ -247,10 +251,15 @@ if active == "Teste Rápido":
         st.info("Escolha **Perfil** ou envie um **YAML** na barra lateral para usar no Teste Rápido.")
 
 elif active == "Perfis":
-    render_profiles_tab()
+    with timed("render:Perfis"):
+        render_profiles_tab()
 
 elif active == "Resultado":
-    render_result_tab()
+    with timed("render:Resultado"):
+        render_result_tab()
+
+elif active == "Diagnóstico":
+    render_diagnostics_tab()
 
 else:  # "Ajuda"
  render_help()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Serial × threads × processos no engine, sobre a planilha de exemplo.
+
+Replica `perfis/apontamentos_manutencao_exemplo.xlsx` até `--rows` linhas e roda
+run_filter com cada perfil de `perfis/` em três modos:
+  - serial:  workers=1;
+  - thread:  workers=N, executor="thread" (perfil compartilhado, sem pickle/spawn);
+  - process: workers=N, executor="process" (inclui o custo de subir o pool).
+Confere que os três resultados são idênticos e imprime tempo e vazão de cada um.
+
+Uso:
+  python benchmarks/bench_executors.py
+  python benchmarks/bench_executors.py --rows 200000 --workers 8 --chunk-size 5000
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from advanced_filter.core.engine import run_filter
+from advanced_filter.core.profile_cache import ProfileCache
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SAMPLE = os.path.join(_ROOT, "perfis", "apontamentos_manutencao_exemplo.xlsx")
+_TEXT_COL = "apontamento manutencao"
+
+def load_sample(rows: int) -> pd.DataFrame:
+    base = pd.read_excel(_SAMPLE)
+    reps = -(-rows // len(base))
+    return pd.concat([base] * reps, ignore_index=True).iloc[:rows]
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--chunk-size", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=3, help="rodadas por modo (vale a menor)")
+    args = ap.parse_args(argv)
+
+    df = load_sample(args.rows)
+    cache = ProfileCache(base_dir=None)
+    profiles = sorted(f for f in os.listdir(os.path.join(_ROOT, "perfis")) if f.endswith(".yaml"))
+    modes = [
+        ("serial", dict(workers=1)),
+        ("thread", dict(workers=args.workers, executor="thread")),
+        ("process", dict(workers=args.workers, executor="process")),
+    ]
+
+    print(f"{len(df)} linhas, workers={args.workers}, chunk={args.chunk_size}, cpus={os.cpu_count()}")
+    print(f"{'perfil':<42} {'modo':<8} {'s':>7} {'linhas/s':>11} {'x serial':>9}")
+    ok = True
+    for name in profiles:
+        with open(os.path.join(_ROOT, "perfis", name), "rb") as fh:
+            profile = cache.get(fh.read())
+        ref, t_serial = None, None
+        for label, kw in modes:
+            best = float("inf")
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                out = run_filter(df, _TEXT_COL, profile, chunk_size=args.chunk_size, **kw)
+                best = min(best, time.perf_counter() - t0)
+            if ref is None:
+                ref, t_serial = out, best
+            elif not out.equals(ref):
+                ok = False
+                print(f"[erro] {name}: resultado de '{label}' difere do serial", file=sys.stderr)
+            print(f"{name:<42} {label:<8} {best:>7.2f} {len(df) / best:>11,.0f} {t_serial / best:>9.2f}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
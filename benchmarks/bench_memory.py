@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Memória por etapa do fluxo da interface, em vários tamanhos de planilha.
+
+Para cada tamanho, a planilha de exemplo é replicada, serializada (xlsx ou csv) e passa
+pelas mesmas etapas de uma execução pelo Streamlit:
+  - upload:     bytes do arquivo enviado;
+  - read_table: leitura para DataFrame;
+  - normalize:  normalização da coluna de texto;
+  - run_filter: matching, decisão e montagem das colunas de resultado;
+  - export:     Excel de saída em memória (xlsxwriter), como no download.
+Mede, por etapa, o pico e o retido (alocado e não liberado ao fim da etapa) via
+tracemalloc, e o pico de RSS amostrado em paralelo (/proc/self/statm; sem /proc, só o
+pico do processo via resource). Sai com código 1 se alguma etapa passar do orçamento de
+bytes por linha (pico do tracemalloc / linhas), para pegar regressões de memória como
+as de tempo.
+
+Uso:
+  python benchmarks/bench_memory.py
+  python benchmarks/bench_memory.py --sizes 10000,100000 --max-bytes-per-row 20000 \\
+      --stage-budget run_filter=6000 --stage-budget export=8000
+"""
+from __future__ import annotations
+import argparse
+import gc
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from advanced_filter.core.engine import compile_profile, run_filter
+from advanced_filter.core.config_loader import load_config
+from advanced_filter.io.excel_io import read_table
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SAMPLE = os.path.join(_ROOT, "perfis", "apontamentos_manutencao_exemplo.xlsx")
+_PROFILE = os.path.join(_ROOT, "perfis", "Manutencao_Motor.yaml")
+_TEXT_COL = "apontamento manutencao"
+STAGES = ("upload", "read_table", "normalize", "run_filter", "export")
+
+# ---------- RSS ----------
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE
+    except Exception:
+        try:
+            import resource  # só o pico do processo (ru_maxrss em KiB no Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            return None
+
+class _RssSampler:
+    """Amostra o RSS a cada `interval` s numa thread; `peak` = maior valor visto."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = _rss_bytes() or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            v = _rss_bytes()
+            if v and v > self.peak:
+                self.peak = v
+
+    def __enter__(self) -> "_RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        v = _rss_bytes()
+        if v and v > self.peak:
+            self.peak = v
+
+# ---------- Medição ----------
+@contextmanager
+def measure(results: Dict[str, Dict[str, float]], stage: str) -> Iterator[None]:
+    gc.collect()
+    before, _ = tracemalloc.get_traced_memory()
+    rss_before = _rss_bytes() or 0
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    with _RssSampler() as rss:
+        yield
+    secs = time.perf_counter() - t0
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    results[stage] = {
+        "peak": peak - before,
+        "retained": current - before,
+        "rss_peak": max(0, rss.peak - rss_before),
+        "secs": secs,
+    }
+
+def make_upload(rows: int, fmt: str) -> bytes:
+    base = pd.read_excel(_SAMPLE)
+    df = pd.concat([base] * -(-rows // len(base)), ignore_index=True).iloc[:rows]
+    buf = io.BytesIO()
+    if fmt == "csv":
+        df.to_csv(buf, index=False)
+    else:
+        with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+            df.to_excel(writer, index=False)
+    return buf.getvalue()
+
+def run_stages(rows: int, fmt: str, profile) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    payload = make_upload(rows, fmt)
+
+    with measure(results, "upload"):
+        data = bytes(payload)  # o que o file_uploader entrega: o arquivo inteiro em memória
+    del payload
+    with measure(results, "read_table"):
+        df = read_table(io.BytesIO(data))
+    with measure(results, "normalize"):
+        norm = [profile.normalize("" if t is None else str(t)) for t in df[_TEXT_COL].tolist()]
+    del norm
+    with measure(results, "run_filter"):
+        result = run_filter(df, _TEXT_COL, profile)
+    with measure(results, "export"):
+        out = io.BytesIO()
+        with pd.ExcelWriter(out, engine="xlsxwriter") as writer:
+            result.to_excel(writer, index=False, sheet_name="Resultado")
+        xlsx = out.getvalue()
+    del data, df, result, out, xlsx
+    return results
+
+def _parse_budgets(items: List[str]) -> Dict[str, float]:
+    budgets: Dict[str, float] = {}
+    for item in items:
+        stage, _, value = item.partition("=")
+        if stage not in STAGES or not value:
+            raise ValueError(f"--stage-budget inválido: {item!r} (use etapa=bytes; etapas: {', '.join(STAGES)}).")
+        budgets[stage] = float(value)
+    return budgets
+
+def _mb(v: float) -> str:
+    return f"{v / 1e6:8.1f}"
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,50000", help="nº de linhas de cada rodada")
+    ap.add_argument("--format", choices=("xlsx", "csv"), default="xlsx", help="formato do upload")
+    ap.add_argument("--max-bytes-per-row", type=float, default=0,
+                    help="orçamento de pico por linha para todas as etapas (0 = sem limite)")
+    ap.add_argument("--stage-budget", action="append", default=[],
+                    help="orçamento de uma etapa, ex.: run_filter=6000 (repita)")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    budgets = _parse_budgets(args.stage_budget)
+    with open(_PROFILE, "rb") as fh:
+        profile = compile_profile(load_config(fh.read()))
+
+    tracemalloc.start()
+    failures: List[str] = []
+    print(f"{'linhas':>8} {'etapa':<11} {'pico MB':>8} {'retido MB':>9} {'RSS+ MB':>8} "
+          f"{'pico B/linha':>12} {'s':>6}")
+    for rows in sizes:
+        results = run_stages(rows, args.format, profile)
+        for stage in STAGES:
+            r = results[stage]
+            per_row = r["peak"] / rows
+            limit = budgets.get(stage, args.max_bytes_per_row)
+            flag = ""
+            if limit and per_row > limit:
+                flag = f"  > orçamento {limit:,.0f}"
+                failures.append(f"{stage} @ {rows} linhas: {per_row:,.0f} B/linha (limite {limit:,.0f})")
+            print(f"{rows:>8} {stage:<11} {_mb(r['peak'])} {_mb(r['retained']):>9} {_mb(r['rss_peak'])} "
+                  f"{per_row:>12,.0f} {r['secs']:>6.2f}{flag}")
+    tracemalloc.stop()
+
+    if failures:
+        print("\nOrçamento de memória excedido:", file=sys.stderr)
+        for f in failures:
+            print(f"  - {f}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Curva de escala do engine pelo nº de termos do perfil (10 → 100k).
+
+Gera termos sintéticos no estilo de listas automáticas (tags de equipamento, códigos de
+peça, palavras e frases), uma base de textos fixa e mede, para cada tamanho:
+  - compile_ms: compile_profile (normalização + índice de termos);
+  - us_por_linha: run_filter sobre o perfil já compilado.
+
+Uso:
+  python benchmarks/bench_term_scaling.py
+  python benchmarks/bench_term_scaling.py --rows 5000 --sizes 10,1000,100000
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from advanced_filter.core.engine import compile_profile, run_filter
+
+_WORDS = (
+    "falha motor bomba rolamento vazamento oleo troca inspecao painel valvula sensor "
+    "correia redutor eixo mancal ruido vibracao aquecimento parada linha prensa esteira "
+    "manutencao preventiva corretiva operador turno setor area equipamento peca ajuste"
+).split()
+
+def make_terms(n: int, rnd: random.Random, prefix: str) -> List[str]:
+    """Mistura de tags (ex.: "bb-01234"), códigos, palavras e frases."""
+    out: List[str] = []
+    for i in range(n):
+        k = i % 4
+        if k == 0:
+            out.append(f"{prefix}{rnd.choice('abcdefgh')}{rnd.choice('abcdefgh')}-{i:05d}")
+        elif k == 1:
+            out.append(f"{prefix}{i:06d}")
+        elif k == 2:
+            out.append(f"{rnd.choice(_WORDS)}{prefix}{i}")
+        else:
+            out.append(f"{rnd.choice(_WORDS)} {prefix}{i} {rnd.choice(_WORDS)}")
+    return out
+
+def make_texts(rows: int, rnd: random.Random, vocab: List[str]) -> List[str]:
+    texts = []
+    for _ in range(rows):
+        words = [rnd.choice(_WORDS) for _ in range(rnd.randint(8, 40))]
+        for _ in range(rnd.randint(0, 3)):  # alguns termos do perfil no meio do texto
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(vocab))
+        texts.append(" ".join(words).capitalize() + ".")
+    return texts
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--sizes", default="10,100,1000,10000,100000")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    rnd = random.Random(args.seed)
+    # a mesma base de textos para todos os tamanhos (termos sorteados do maior perfil)
+    big = {c: make_terms(max(sizes), rnd, c[0]) for c in ("positives", "negatives", "contexts")}
+    df = pd.DataFrame({"texto": make_texts(args.rows, rnd, big["positives"][:1000] + big["negatives"][:1000])})
+
+    print(f"{'termos/classe':>14} {'compile_ms':>11} {'us_por_linha':>13} {'incluidas':>10}")
+    for n in sizes:
+        cfg = {
+            "positives": big["positives"][:n],
+            "negatives": big["negatives"][:n],
+            "contexts": big["contexts"][:n],
+            "window": 8,
+        }
+        t0 = time.perf_counter()
+        profile = compile_profile(cfg)
+        t1 = time.perf_counter()
+        out = run_filter(df, "texto", profile)
+        t2 = time.perf_counter()
+        inc = int((out["decision"] == "INCLUI").sum())
+        print(f"{n:>14} {(t1 - t0) * 1e3:>11.1f} {(t2 - t1) / len(df) * 1e6:>13.1f} {inc:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+
+import advanced_filter.service as service
+from advanced_filter.core.profile_cache import ProfileCache
+
+def test_evict_keeps_batcher_busy_in_engine(monkeypatch):
+    """Perfil inline com lote no engine não é descarregado ao carregar outro (max_profiles=1)."""
+    in_engine, release = threading.Event(), threading.Event()
+    real = service.classify_texts
+
+    def slow_classify(texts, profile, chunk_size):
+        in_engine.set()
+        release.wait(5)
+        return real(texts, profile, chunk_size)
+
+    monkeypatch.setattr(service, "classify_texts", slow_classify)
+
+    async def scenario():
+        svc = service.ClassificationService(None, max_wait_ms=0, max_profiles=1,
+                                            cache=ProfileCache(base_dir=None))
+        loop = asyncio.get_running_loop()
+        a = asyncio.ensure_future(svc.classify({"profile_yaml": "positives: [motor]\n", "text": "troca do motor"}))
+        await loop.run_in_executor(None, in_engine.wait, 5)
+        assert in_engine.is_set()
+        monkeypatch.setattr(service, "classify_texts", real)
+        b = await svc.classify({"profile_yaml": "positives: [bomba]\n", "text": "bomba nova"})
+        release.set()
+        res_a = await asyncio.wait_for(a, 5)
+        return res_a, b, svc
+
+    res_a, res_b, svc = asyncio.run(scenario())
+    assert res_a["results"][0]["decision"] == "INCLUI"
+    assert res_b["results"][0]["decision"] == "INCLUI"
+    assert len(svc._batchers) == 1  # A saiu depois de responder, na carga seguinte
+
+def test_close_fails_queued_requests():
+    async def scenario():
+        svc = service.ClassificationService(None, cache=ProfileCache(base_dir=None))
+        b = await svc._batcher_for_async(b"positives: [motor]\n")
+        b._task.cancel()  # lote parado: o pedido fica na fila
+        req = asyncio.ensure_future(b.submit(["motor"]))
+        await asyncio.sleep(0)
+        b.close()
+        try:
+            await asyncio.wait_for(req, 1)
+        except service.HTTPError as e:
+            return e.status
+    assert asyncio.run(scenario()) == 503